@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Raw HTML Archive
+
+Append-only archive of the raw HTTP responses fetched by the crawler, so
+articles can be re-extracted and re-hashed offline without touching the
+network.
+
+Each response is written as a WARC/1.1 "response" record compressed as its
+own gzip member, which makes every segment a standard .warc.gz file. Segments
+are rotated by size and never rewritten. Next to each segment sits a
+CDX-style index (one JSON line per record) holding the URL, fetch time and
+byte range of the record, so a record can be read back with a single seek.
+"""
+
+import os
+import gzip
+import json
+import uuid
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Iterator, Iterable, Tuple, NamedTuple
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_SEGMENT_BYTES = int(os.getenv("ARCHIVE_SEGMENT_MB", "256")) * 1024 * 1024
+
+SEGMENT_SUFFIX = ".warc.gz"
+INDEX_SUFFIX = ".cdxj"
+
+# requests hands us the decoded body, so these no longer describe the payload
+STRIPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+class ArchiveRecord(NamedTuple):
+    """A single archived HTTP response."""
+    url: str
+    fetched_at: datetime
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+def _build_record(url: str, fetched_at: datetime, status: int,
+                  headers: Iterable[Tuple[str, str]], body: bytes) -> bytes:
+    """Serialize a response as an uncompressed WARC response record."""
+    http_head = [f"HTTP/1.1 {status}"]
+    for name, value in headers:
+        if name.lower() not in STRIPPED_HEADERS:
+            http_head.append(f"{name}: {value}")
+    http_head.append(f"Content-Length: {len(body)}")
+    block = ("\r\n".join(http_head) + "\r\n\r\n").encode("utf-8") + body
+
+    warc_head = [
+        "WARC/1.1",
+        "WARC-Type: response",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {fetched_at.strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        f"WARC-Target-URI: {url}",
+        f"WARC-Payload-Digest: sha256:{hashlib.sha256(body).hexdigest()}",
+        "Content-Type: application/http;msgtype=response",
+        f"Content-Length: {len(block)}",
+    ]
+    return ("\r\n".join(warc_head) + "\r\n\r\n").encode("utf-8") + block + b"\r\n\r\n"
+
+def _parse_record(data: bytes) -> ArchiveRecord:
+    """Parse an uncompressed WARC response record."""
+    warc_head, _, rest = data.partition(b"\r\n\r\n")
+    warc_headers = {}
+    for line in warc_head.decode("utf-8").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        warc_headers[name.strip().lower()] = value.strip()
+    block = rest[:int(warc_headers["content-length"])]
+
+    http_head, _, body = block.partition(b"\r\n\r\n")
+    lines = http_head.decode("utf-8").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = []
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers.append((name.strip(), value.strip()))
+
+    fetched_at = datetime.strptime(warc_headers["warc-date"], "%Y-%m-%dT%H:%M:%SZ")
+    return ArchiveRecord(
+        url=warc_headers["warc-target-uri"],
+        fetched_at=fetched_at.replace(tzinfo=timezone.utc),
+        status=status,
+        headers=headers,
+        body=body
+    )
+
+class ArchiveWriter:
+    """Appends raw responses to size-rotated WARC segments."""
+
+    def __init__(self, directory: str = ARCHIVE_DIR, segment_bytes: int = ARCHIVE_SEGMENT_BYTES):
+        """
+        Initialize the writer. Segments are opened lazily on first write.
+
+        Args:
+            directory: Directory holding segments and their indexes
+            segment_bytes: Size after which a new segment is started
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._segment_name = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_segment(self):
+        """Start a new segment. Existing segments are never reopened."""
+        self._close_segment()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
+        self._segment_name = f"segment-{stamp}-{os.getpid()}"
+        base = os.path.join(self.directory, self._segment_name)
+        self._segment = open(base + SEGMENT_SUFFIX, "ab")
+        self._index = open(base + INDEX_SUFFIX, "a", encoding="utf-8")
+        logger.info(f"Opened archive segment {self._segment_name}")
+
+    def _close_segment(self):
+        """Close the current segment and its index, if any."""
+        if self._segment:
+            self._segment.close()
+            self._index.close()
+            self._segment = None
+            self._index = None
+
+    def write(self, url: str, status: int, headers: Iterable[Tuple[str, str]],
+              body: bytes, fetched_at: Optional[datetime] = None):
+        """
+        Append a response to the archive.
+
+        Args:
+            url: Requested URL
+            status: HTTP status code
+            headers: Response headers as (name, value) pairs
+            body: Decoded response body
+            fetched_at: Fetch time, defaults to now
+        """
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        compressed = gzip.compress(_build_record(url, fetched_at, status, headers, body))
+
+        with self._lock:
+            if not self._segment or self._segment.tell() >= self.segment_bytes:
+                self._open_segment()
+            offset = self._segment.tell()
+            self._segment.write(compressed)
+            self._segment.flush()
+            self._index.write(json.dumps({
+                "url": url,
+                "fetched_at": fetched_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "status": status,
+                "offset": offset,
+                "length": len(compressed)
+            }) + "\n")
+            self._index.flush()
+
+    def close(self):
+        """Close the open segment."""
+        with self._lock:
+            self._close_segment()
+
+class ArchiveReader:
+    """Reads records back from an archive directory."""
+
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        """
+        Initialize the reader.
+
+        Args:
+            directory: Directory holding segments and their indexes
+        """
+        self.directory = directory
+        self._latest = None
+
+    def segments(self) -> List[str]:
+        """Return segment names in the order they were written."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[:-len(INDEX_SUFFIX)]
+            for name in os.listdir(self.directory)
+            if name.endswith(INDEX_SUFFIX)
+        )
+
+    def iter_index(self, segment: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the index entries of one segment.
+
+        Args:
+            segment: Segment name
+
+        Yields:
+            Index entries with the segment name added
+        """
+        with open(os.path.join(self.directory, segment + INDEX_SUFFIX), encoding="utf-8") as f:
+            for line in f:
+                # A crash mid-write can leave a truncated last line
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entry["segment"] = segment
+                yield entry
+
+    def read(self, entry: Dict[str, Any]) -> ArchiveRecord:
+        """
+        Read the record an index entry points to.
+
+        Args:
+            entry: Index entry from iter_index
+
+        Returns:
+            The archived response
+        """
+        with open(os.path.join(self.directory, entry["segment"] + SEGMENT_SUFFIX), "rb") as f:
+            f.seek(entry["offset"])
+            return _parse_record(gzip.decompress(f.read(entry["length"])))
+
+    def iter_records(self, segment: str) -> Iterator[Tuple[Dict[str, Any], ArchiveRecord]]:
+        """
+        Stream every record of a segment sequentially.
+
+        Args:
+            segment: Segment name
+
+        Yields:
+            (index entry, record) pairs in write order
+        """
+        with open(os.path.join(self.directory, segment + SEGMENT_SUFFIX), "rb") as f:
+            for entry in self.iter_index(segment):
+                f.seek(entry["offset"])
+                yield entry, _parse_record(gzip.decompress(f.read(entry["length"])))
+
+    def lookup(self, url: str) -> Optional[ArchiveRecord]:
+        """
+        Return the most recently fetched record for a URL.
+
+        Args:
+            url: Article URL
+
+        Returns:
+            The latest archived response or None if the URL was never archived
+        """
+        if self._latest is None:
+            self._latest = {}
+            for segment in self.segments():
+                for entry in self.iter_index(segment):
+                    current = self._latest.get(entry["url"])
+                    if not current or entry["fetched_at"] >= current["fetched_at"]:
+                        self._latest[entry["url"]] = entry
+        entry = self._latest.get(url)
+        return self.read(entry) if entry else None
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Async Article Storage
+
+An asyncpg backend for storing articles from asyncio code without blocking
+the event loop or handing writes to threads. It writes the same rows as the
+psycopg2 code in PalestineNewsCrawler.store_article, including blobs, and
+keeps the URL filter and lookup cache current.
+
+This is the storage layer only: the crawler still fetches synchronously,
+and the article scraper's seed command is the one caller today. An async
+fetch loop can store through PalestineNewsCrawler.async_store.
+
+- Single articles: the existence check, blob and insert run on a pooled
+  connection as prepared statements, so concurrent stores overlap on the
+  pool's connections instead of queuing behind one.
+- Batches: rows are sent with binary COPY into a temporary staging table
+  and moved into articles (and article_blobs) with one INSERT ... SELECT,
+  a handful of round trips however many articles there are.
+- Anchors: transaction hashes are written with executemany, which asyncpg
+  pipelines in a single round trip.
+
+Schema migrations, the blob dictionary and partition creation stay on the
+psycopg2 connection the crawler already holds; they run once per process
+or per month rather than per article, and partition checks run in a thread.
+
+    python cli.py seed --async
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from cache import ARTICLE_CACHE, ArticleCache
+from db import DB_HOST, DB_NAME, DB_PASSWORD, DB_POOL_MAX, DB_POOL_MIN, DB_PORT, DB_USER
+from records import ARTICLE_COLUMNS, ArticleRecord, naive_utc
+from urlfilter import UrlFilter
+
+logger = logging.getLogger(__name__)
+
+BLOB_COLUMNS = ("content_hash", "dictionary_id", "raw_size", "body")
+
+# Dropped at the end of each transaction, so pooled connections can reuse the name
+STAGING_TABLES = """
+CREATE TEMP TABLE IF NOT EXISTS article_staging (
+    title TEXT,
+    source_url TEXT,
+    source_name TEXT,
+    publication_date TIMESTAMP,
+    content_text TEXT,
+    content_hash TEXT
+) ON COMMIT DROP;
+CREATE TEMP TABLE IF NOT EXISTS blob_staging (
+    content_hash TEXT,
+    dictionary_id INTEGER,
+    raw_size INTEGER,
+    body BYTEA
+) ON COMMIT DROP
+"""
+
+async def create_pool(min_size: int = DB_POOL_MIN, max_size: int = DB_POOL_MAX):
+    """
+    Open an asyncpg connection pool with the settings from db.py.
+
+    Args:
+        min_size: Connections opened up front
+        max_size: Most connections open at once
+
+    Returns:
+        asyncpg Pool
+    """
+    # Imported here so the synchronous crawler doesn't require asyncpg
+    import asyncpg
+
+    return await asyncpg.create_pool(
+        host=DB_HOST, port=int(DB_PORT), database=DB_NAME, user=DB_USER, password=DB_PASSWORD,
+        min_size=min_size, max_size=max_size
+    )
+
+class AsyncArticleStore:
+    """Stores articles through an asyncpg pool."""
+
+    def __init__(self, pool, blobs=None, partitions=None,
+                 known_urls: Optional[UrlFilter] = None, cache: ArticleCache = ARTICLE_CACHE,
+                 db_lock=None):
+        """
+        Initialize the store.
+
+        Args:
+            pool: asyncpg Pool
+            blobs: BlobStore whose compressor and dictionary to use, None to store bodies inline
+            partitions: PartitionManager to create monthly partitions with, if articles is partitioned
+            known_urls: URL filter to answer existence checks from and add stored
+                URLs to, only one loaded from the database like the crawler's
+            cache: Lookup cache to read through and keep current
+            db_lock: Lock guarding the partition manager's connection, if it is shared
+        """
+        self.pool = pool
+        self.blobs = blobs
+        self.partitions = partitions
+        self.known_urls = known_urls
+        self.cache = cache
+        self.db_lock = db_lock or threading.Lock()
+
+    def _blob_row(self, article: ArticleRecord) -> Tuple:
+        """Compress an article body into an article_blobs row."""
+        data = article.content_text.encode()
+        return (article.content_hash_hex, self.blobs.dictionary_id, len(data),
+                self.blobs.compressor.compress(data))
+
+    async def _ensure_partitions(self, articles: Iterable[ArticleRecord]):
+        """Create the monthly partitions the articles belong in, if missing."""
+        if self.partitions:
+            # psycopg2 blocks, so keep it off the event loop
+            await asyncio.to_thread(self._ensure_partitions_sync, list(articles))
+
+    def _ensure_partitions_sync(self, articles: List[ArticleRecord]):
+        """Create missing monthly partitions on the psycopg2 connection."""
+        with self.db_lock:
+            for article in articles:
+                # Only queries the first time a month is seen
+                self.partitions.ensure_for(naive_utc(article.publication_date))
+
+    async def article_exists(self, url: str) -> bool:
+        """
+        Check whether an article is already stored under a URL.
+
+        Args:
+            url: Canonical article URL
+
+        Returns:
+            True if the article is stored
+        """
+        if self.known_urls is not None and not self.known_urls.might_contain(url):
+            return False
+
+        async def load() -> Optional[int]:
+            return await self.pool.fetchval("SELECT id FROM articles WHERE source_url = $1", url)
+
+        return await self.cache.article_id_async(url, load) is not None
+
+    async def store_article(self, article: ArticleRecord) -> Optional[int]:
+        """
+        Store one article unless its URL is already stored.
+
+        Args:
+            article: Article record
+
+        Returns:
+            ID of the new or already stored article, None if storing failed
+        """
+        inserted = False
+        try:
+            await self._ensure_partitions([article])
+            async with self.pool.acquire() as conn, conn.transaction():
+                article_id = await conn.fetchval("SELECT id FROM articles WHERE source_url = $1",
+                                                 article.source_url)
+                if article_id is None:
+                    inserted = True
+                    content_text = article.content_text
+                    if self.blobs:
+                        await conn.execute("""
+                        INSERT INTO article_blobs (content_hash, dictionary_id, raw_size, body)
+                        VALUES ($1, $2, $3, $4)
+                        ON CONFLICT (content_hash) DO NOTHING
+                        """, *self._blob_row(article))
+                        content_text = None
+                    article_id = await conn.fetchval("""
+                    INSERT INTO articles (
+                        title, source_url, source_name, publication_date,
+                        content_text, content_hash
+                    ) VALUES ($1, $2, $3, $4, $5, $6) RETURNING id
+                    """, *article.db_row(content_text))
+                    logger.info("Stored article: %s (ID: %d)", article.title, article_id,
+                                extra={"article_id": article_id, "source": article.source_name})
+        except Exception as e:
+            logger.error("Error storing article: %s", e, extra={"url": article.source_url})
+            return None
+
+        if inserted:
+            if self.known_urls is not None:
+                self.known_urls.add(article.source_url)
+            self.cache.stored(article.source_url, article_id, article.content_hash_hex)
+        return article_id
+
+    async def store_articles(self, articles: Sequence[ArticleRecord]) -> Dict[str, int]:
+        """
+        Store a batch of articles with binary COPY, skipping stored URLs.
+
+        Args:
+            articles: Article records
+
+        Returns:
+            IDs of the newly stored articles by URL; URLs already stored are
+            left out, and a URL repeated within the batch is stored once.
+            Empty if the batch couldn't be stored
+        """
+        if not articles:
+            return {}
+        try:
+            await self._ensure_partitions(articles)
+            rows = [article.db_row(None) if self.blobs else article.db_row() for article in articles]
+            async with self.pool.acquire() as conn, conn.transaction():
+                await conn.execute(STAGING_TABLES)
+                await conn.copy_records_to_table("article_staging", records=rows, columns=ARTICLE_COLUMNS)
+                if self.blobs:
+                    blob_rows = {article.content_hash: self._blob_row(article) for article in articles}
+                    await conn.copy_records_to_table("blob_staging", records=list(blob_rows.values()),
+                                                     columns=BLOB_COLUMNS)
+                    await conn.execute("""
+                    INSERT INTO article_blobs (content_hash, dictionary_id, raw_size, body)
+                    SELECT content_hash, dictionary_id, raw_size, body FROM blob_staging
+                    ON CONFLICT (content_hash) DO NOTHING
+                    """)
+                # No conflict target: on a partitioned table source_url is only
+                # unique together with publication_date, and article_urls
+                # fails the batch if another writer stored a URL meanwhile
+                stored = await conn.fetch("""
+                INSERT INTO articles (title, source_url, source_name, publication_date, content_text, content_hash)
+                SELECT DISTINCT ON (s.source_url)
+                    s.title, s.source_url, s.source_name, s.publication_date, s.content_text, s.content_hash
+                FROM article_staging s
+                WHERE NOT EXISTS (SELECT 1 FROM articles a WHERE a.source_url = s.source_url)
+                ORDER BY s.source_url
+                ON CONFLICT DO NOTHING
+                RETURNING id, source_url, content_hash
+                """)
+        except Exception as e:
+            logger.error("Error storing %d articles: %s", len(articles), e)
+            return {}
+
+        article_ids = {}
+        for row in stored:
+            article_ids[row["source_url"]] = row["id"]
+            if self.known_urls is not None:
+                self.known_urls.add(row["source_url"])
+            self.cache.stored(row["source_url"], row["id"], row["content_hash"])
+        logger.info("Stored %d of %d articles", len(article_ids), len(articles))
+        return article_ids
+
+    async def record_anchors(self, anchors: List[Tuple[int, str]]):
+        """
+        Save the blockchain transactions of anchored articles.
+
+        Args:
+            anchors: (article ID, transaction hash) pairs
+        """
+        async with self.pool.acquire() as conn, conn.transaction():
+            await conn.executemany("UPDATE articles SET blockchain_tx_hash = $2 WHERE id = $1", anchors)
+            hashes = await conn.fetch("SELECT content_hash FROM articles WHERE id = ANY($1::int[])",
+                                      [article_id for article_id, _ in anchors])
+        for row in hashes:
+            self.cache.invalidate_hash(row["content_hash"])
+
+    async def close(self):
+        """Close the pool."""
+        await self.pool.close()
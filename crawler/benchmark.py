@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Crawler Benchmark
+
+Runs PalestineNewsCrawler against the local fake publisher and a throwaway
+PostgreSQL database, then reports throughput, per-article latency and peak
+memory. Nothing touches real news sites.
+
+    python benchmark.py --articles 50 --latency-ms 80 --error-rate 0.02 --json before.json
+
+The database named by DB_NAME is left alone: a scratch database is created
+next to it (DB_USER needs CREATEDB) and dropped afterwards. Anchoring is
+benchmarked only when --rpc, --contract and --private-key point at a local
+anvil/Hardhat chain with the verifier contract deployed.
+
+--startup measures how long the crawler modules take to import in a fresh
+interpreter instead, and which heavy dependencies they load:
+
+    python benchmark.py --startup --repeat 10
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import socket
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+from typing import Dict, List, Any, Optional
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+# Modules timed by --startup and the dependencies they should not load
+STARTUP_MODULES = ("cli", "crawler", "article_scraper")
+HEAVY_MODULES = ("web3", "newspaper", "bs4")
+
+STARTUP_PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {directory!r})
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_publisher(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    """Start the fake publisher in its own process and wait until it listens."""
+    process = subprocess.Popen([
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_publisher.py"),
+        "--port", str(port),
+        "--sources", str(args.sources),
+        "--articles", str(args.articles),
+        "--size-kb", str(args.size_kb),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--seed", str(args.seed),
+    ], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    return process
+
+def create_scratch_database(db) -> str:
+    """Create an empty database for the run and return its name."""
+    name = f"{db.DB_NAME}_bench_{os.getpid()}"
+    conn = psycopg2.connect(host=db.DB_HOST, port=db.DB_PORT, dbname=db.DB_NAME,
+                            user=db.DB_USER, password=db.DB_PASSWORD)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f'CREATE DATABASE "{name}"')
+    conn.close()
+    return name
+
+def drop_scratch_database(db, name: str):
+    """Drop the database created by create_scratch_database."""
+    conn = psycopg2.connect(host=db.DB_HOST, port=db.DB_PORT, dbname=db.DB_NAME,
+                            user=db.DB_USER, password=db.DB_PASSWORD)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS "{name}"')
+    conn.close()
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run one crawl against the fake publisher.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Benchmark results
+    """
+    import db
+    import crawler
+    from sources import load_sources
+    from fake_publisher import FakePublisher
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    templates = FakePublisher(load_sources()[:args.sources])
+    publisher = start_publisher(args, port)
+
+    original_db_name = db.DB_NAME
+    scratch_db = create_scratch_database(db)
+    db.DB_NAME = scratch_db
+
+    sources = templates.source_configs(base_url, args.concurrency)
+    crawler.CRAWL_DELAY_SECONDS = 0
+    crawler.ARCHIVE_DIR = tempfile.mkdtemp(prefix="crawler-bench-archive-") if args.archive else ""
+    if args.rpc:
+        crawler.POLYGON_RPC = args.rpc
+        crawler.CONTRACT_ADDRESS = args.contract
+        crawler.PRIVATE_KEY = args.private_key
+    else:
+        crawler.CONTRACT_ADDRESS = crawler.PRIVATE_KEY = ""
+
+    latencies: List[float] = []
+
+    class TimedCrawler(crawler.PalestineNewsCrawler):
+        def process_article(self, url, source):
+            start = time.perf_counter()
+            fetched = super().process_article(url, source)
+            if fetched:
+                latencies.append(time.perf_counter() - start)
+            return fetched
+
+    try:
+        instance = TimedCrawler()
+        try:
+            started = time.perf_counter()
+            instance.crawl_sources(sources)
+            elapsed = time.perf_counter() - started
+            with instance.conn.cursor() as cursor:
+                cursor.execute("SELECT count(*), count(blockchain_tx_hash) FROM articles")
+                stored, anchored = cursor.fetchone()
+        finally:
+            instance.close()
+    finally:
+        publisher.terminate()
+        publisher.wait()
+        db.DB_NAME = original_db_name
+        if not args.keep_db:
+            drop_scratch_database(db, scratch_db)
+
+    return {
+        "sources": args.sources,
+        "articles_per_source": args.articles,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "elapsed_seconds": round(elapsed, 3),
+        "articles_stored": stored,
+        "articles_anchored": anchored,
+        "articles_per_second": round(stored / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+def run_startup_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Time importing each crawler module in a fresh interpreter.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Median import and process times, peak RSS and heavy modules loaded
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    # Run from a scratch directory so the modules' log files land there
+    workdir = tempfile.mkdtemp(prefix="crawler-bench-startup-")
+    results: Dict[str, Any] = {"repeat": args.repeat}
+    for module in STARTUP_MODULES:
+        probe = STARTUP_PROBE.format(directory=directory, module=module, heavy=HEAVY_MODULES)
+        imports, processes, rss, loaded = [], [], 0.0, []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", probe], cwd=workdir, check=True,
+                                    stdout=subprocess.PIPE, text=True).stdout
+            processes.append(time.perf_counter() - started)
+            sample = json.loads(output.splitlines()[-1])
+            imports.append(sample["seconds"])
+            rss = max(rss, sample["rss_mb"])
+            loaded = sample["loaded"]
+        results[f"{module}_import_ms"] = round(percentile(imports, 0.5) * 1000, 1)
+        results[f"{module}_process_ms"] = round(percentile(processes, 0.5) * 1000, 1)
+        results[f"{module}_rss_mb"] = round(rss, 1)
+        results[f"{module}_heavy_loaded"] = ",".join(loaded) or "none"
+    return results
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the benchmark options to a parser."""
+    parser.add_argument("--sources", type=int, default=2, help="number of fake sources")
+    parser.add_argument("--articles", type=int, default=20, help="articles per source")
+    parser.add_argument("--concurrency", type=int, default=1, help="article downloads in flight per source")
+    parser.add_argument("--size-kb", type=int, default=8, help="approximate article size")
+    parser.add_argument("--latency-ms", type=float, default=0, help="latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="maximum random extra latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of article requests that fail")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--archive", action="store_true", help="also write the raw HTML archive")
+    parser.add_argument("--rpc", help="local chain RPC URL, e.g. http://127.0.0.1:8545")
+    parser.add_argument("--contract", help="verifier contract address on the local chain")
+    parser.add_argument("--private-key", help="funded account key on the local chain")
+    parser.add_argument("--keep-db", action="store_true", help="don't drop the scratch database")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--startup", action="store_true",
+                        help="time importing the crawler modules instead of crawling")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per module with --startup")
+
+def report(results: Dict[str, Any], json_path: Optional[str] = None):
+    """Print benchmark results and optionally write them as JSON."""
+    for key, value in results.items():
+        print(f"{key:>22}: {value}")
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+def main():
+    """Main function to run the crawler benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against a local fake publisher")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.rpc and not (args.contract and args.private_key):
+        parser.error("--rpc requires --contract and --private-key")
+
+    if args.startup:
+        report(run_startup_benchmark(args), args.json)
+        return
+
+    # Keep per-article log lines out of the measurement
+    logging.basicConfig(level=logging.WARNING)
+    report(run_benchmark(args), args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Content-Addressed Article Bodies
+
+Optional storage mode (CONTENT_STORAGE=blob) in which article bodies live in
+the article_blobs table, keyed by content_hash and zstd-compressed with a
+dictionary trained on our own articles, while articles.content_text stays
+NULL. Syndicated copies of the same text share a single blob.
+
+Maintenance commands:
+
+    python blobstore.py train     # train a new compression dictionary
+    python blobstore.py migrate   # move inline bodies into blobs
+"""
+
+import os
+import sys
+import logging
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+CONTENT_STORAGE = os.getenv("CONTENT_STORAGE", "inline")
+BLOB_COMPRESSION_LEVEL = int(os.getenv("BLOB_COMPRESSION_LEVEL", "9"))
+BLOB_DICTIONARY_SIZE = int(os.getenv("BLOB_DICTIONARY_KB", "112")) * 1024
+
+def blob_storage_enabled() -> bool:
+    """Return True if article bodies should be stored as blobs."""
+    return CONTENT_STORAGE == "blob"
+
+class BlobStore:
+    """Reads and writes compressed, content-addressed article bodies."""
+
+    def __init__(self, conn):
+        """
+        Initialize the store and load the current dictionary.
+
+        Args:
+            conn: psycopg2 connection
+        """
+        # Imported here so inline storage doesn't require zstandard
+        import zstandard
+
+        self._zstd = zstandard
+        self.conn = conn
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._decompressors: Dict[Optional[int], "zstandard.ZstdDecompressor"] = {}
+        self.dictionary_id = None
+        self.compressor = zstandard.ZstdCompressor(level=BLOB_COMPRESSION_LEVEL)
+        self.load_current_dictionary()
+
+    def _dictionary(self, dictionary_id: int):
+        """Fetch and cache a dictionary by ID."""
+        if dictionary_id not in self._dictionaries:
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT dictionary FROM blob_dictionaries WHERE id = %s", (dictionary_id,))
+                data = bytes(cursor.fetchone()[0])
+            self._dictionaries[dictionary_id] = self._zstd.ZstdCompressionDict(data)
+        return self._dictionaries[dictionary_id]
+
+    def load_current_dictionary(self):
+        """Switch compression to the most recently trained dictionary."""
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT max(id) FROM blob_dictionaries")
+            dictionary_id = cursor.fetchone()[0]
+        self.conn.commit()
+        if dictionary_id is None:
+            return
+        self.dictionary_id = dictionary_id
+        self.compressor = self._zstd.ZstdCompressor(
+            level=BLOB_COMPRESSION_LEVEL,
+            dict_data=self._dictionary(dictionary_id)
+        )
+
+    def put(self, cursor, content_hash: str, text: str):
+        """
+        Store an article body unless a blob with the same hash exists.
+
+        Runs on the caller's cursor so the blob and the article row commit
+        together.
+
+        Args:
+            cursor: Cursor of the caller's transaction
+            content_hash: Hex SHA-256 of the text
+            text: Article body
+        """
+        data = text.encode()
+        cursor.execute("""
+        INSERT INTO article_blobs (content_hash, dictionary_id, raw_size, body)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (content_hash) DO NOTHING
+        """, (content_hash, self.dictionary_id, len(data), self.compressor.compress(data)))
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """
+        Load an article body.
+
+        Args:
+            content_hash: Hex SHA-256 of the text
+
+        Returns:
+            Article body or None if no blob exists
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT dictionary_id, body FROM article_blobs WHERE content_hash = %s",
+                (content_hash,)
+            )
+            row = cursor.fetchone()
+        if not row:
+            return None
+        dictionary_id, body = row
+        if dictionary_id not in self._decompressors:
+            if dictionary_id is None:
+                self._decompressors[None] = self._zstd.ZstdDecompressor()
+            else:
+                self._decompressors[dictionary_id] = self._zstd.ZstdDecompressor(
+                    dict_data=self._dictionary(dictionary_id)
+                )
+        return self._decompressors[dictionary_id].decompress(bytes(body)).decode()
+
+    def train_dictionary(self, sample_limit: int = 5000) -> Optional[int]:
+        """
+        Train a dictionary on a sample of stored article bodies.
+
+        Args:
+            sample_limit: Maximum number of articles to sample
+
+        Returns:
+            ID of the new dictionary or None if there were too few samples
+        """
+        samples = []
+        with self.conn.cursor() as cursor:
+            cursor.execute("""
+            SELECT content_text FROM articles
+            WHERE content_text IS NOT NULL AND content_text <> ''
+            ORDER BY random() LIMIT %s
+            """, (sample_limit,))
+            samples.extend(row[0].encode() for row in cursor.fetchall())
+        for content_hash in self._sample_blob_hashes(sample_limit - len(samples)):
+            samples.append(self.get(content_hash).encode())
+
+        if len(samples) < 10:
+            logger.warning(f"Not enough articles to train a dictionary ({len(samples)} found)")
+            return None
+
+        dictionary = self._zstd.train_dictionary(BLOB_DICTIONARY_SIZE, samples)
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO blob_dictionaries (dictionary) VALUES (%s) RETURNING id",
+                (dictionary.as_bytes(),)
+            )
+            dictionary_id = cursor.fetchone()[0]
+        self.conn.commit()
+        logger.info(f"Trained dictionary {dictionary_id} on {len(samples)} articles")
+        self.load_current_dictionary()
+        return dictionary_id
+
+    def _sample_blob_hashes(self, limit: int):
+        """Return up to limit random blob hashes."""
+        if limit <= 0:
+            return []
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT content_hash FROM article_blobs ORDER BY random() LIMIT %s", (limit,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def migrate_inline(self, batch_size: int = 500) -> int:
+        """
+        Move inline article bodies into blobs.
+
+        Args:
+            batch_size: Number of articles moved per transaction
+
+        Returns:
+            Number of articles moved
+        """
+        moved = 0
+        while True:
+            with self.conn.cursor() as cursor:
+                cursor.execute("""
+                SELECT id, content_hash, content_text FROM articles
+                WHERE content_text IS NOT NULL
+                LIMIT %s FOR UPDATE SKIP LOCKED
+                """, (batch_size,))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                for _, content_hash, content_text in rows:
+                    self.put(cursor, content_hash, content_text)
+                cursor.execute(
+                    "UPDATE articles SET content_text = NULL WHERE id = ANY(%s)",
+                    ([row[0] for row in rows],)
+                )
+            self.conn.commit()
+            moved += len(rows)
+            logger.info(f"Moved {moved} article bodies into blobs")
+        return moved
+
+def main():
+    """Main function to run blob store maintenance commands."""
+    from db import connect
+    from migrations import apply_migrations
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if len(sys.argv) != 2 or sys.argv[1] not in ("train", "migrate"):
+        print("usage: blobstore.py train|migrate", file=sys.stderr)
+        sys.exit(2)
+
+    conn = connect()
+    try:
+        apply_migrations(conn)
+        store = BlobStore(conn)
+        if sys.argv[1] == "train":
+            store.train_dictionary()
+        else:
+            store.migrate_inline()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
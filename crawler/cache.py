@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Article Lookup Cache
+
+Read-through cache for the two questions asked of the articles table over
+and over: "is this URL stored?" and "is this content hash anchored?".
+Answers, negative ones included, are kept in an in-process LRU for
+CACHE_TTL_SECONDS. With CACHE_REDIS_URL set they are also shared through
+Redis (or any server speaking its protocol), so processes on one machine
+answer each other's lookups.
+
+Writers keep entries current instead of waiting for them to expire:
+store_article records the new URL and drops the entry of its hash, the
+anchoring worker drops the entry of every hash it anchors. The TTL bounds
+how stale an entry written by a process without the cache can get.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+from metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", "50000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "600"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+
+# Returned by get() for keys that aren't cached, since None is a cached answer
+MISSING = object()
+
+class AnchorStatus(NamedTuple):
+    """Where a content hash is stored and the transaction that anchored it."""
+
+    article_id: int
+    revision_id: Optional[int]
+    tx_hash: Optional[str]
+
+class LRUCache:
+    """Thread-safe least-recently-used cache whose entries expire."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL_SECONDS):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or MISSING if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        """
+        Cache a value.
+
+        Args:
+            key: Cache key
+            value: Value, None included
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """
+        Drop a key.
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+class RedisCache:
+    """Cache shared between processes through a Redis-compatible server."""
+
+    def __init__(self, url: str, ttl: float = CACHE_TTL_SECONDS, prefix: str = "pnh:"):
+        """
+        Connect to the server.
+
+        Args:
+            url: Server URL, e.g. redis://127.0.0.1:6379/0
+            ttl: Seconds an entry stays valid
+            prefix: Prepended to every key
+
+        Raises:
+            ImportError: If the redis package isn't installed
+        """
+        # Imported here: the shared cache is optional
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.ttl = max(1, int(ttl))
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        """Look up a key, MISSING if absent."""
+        raw = self.client.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any):
+        """Cache a JSON-serializable value."""
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key: str):
+        """Drop a key."""
+        self.client.delete(self.prefix + key)
+
+class ArticleCache:
+    """Read-through cache of article lookups by URL and by content hash."""
+
+    def __init__(self, local: Optional[LRUCache] = None, shared: Optional[RedisCache] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            local: In-process cache, a new LRUCache if omitted
+            shared: Cache shared with other processes, if any
+        """
+        self.local = local if local is not None else LRUCache()
+        self.shared = shared
+
+    @classmethod
+    def from_env(cls) -> "ArticleCache":
+        """Build the cache from the CACHE_* settings."""
+        shared = None
+        if CACHE_REDIS_URL:
+            try:
+                shared = RedisCache(CACHE_REDIS_URL)
+            except ImportError:
+                logger.error("CACHE_REDIS_URL is set but the redis package isn't installed, "
+                             "caching in process only")
+        return cls(LRUCache(), shared)
+
+    def _lookup(self, key: str) -> Any:
+        """Return a key's value from the local or the shared cache, MISSING if neither has it."""
+        kind = key.split(":", 1)[0]
+        value = self.local.get(key)
+        if value is not MISSING:
+            CACHE_LOOKUPS.labels(kind, "hit").inc()
+            return value
+        if self.shared:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared cache read failed: {e}")
+            if value is not MISSING:
+                CACHE_LOOKUPS.labels(kind, "shared_hit").inc()
+                self.local.set(key, value)
+                return value
+        CACHE_LOOKUPS.labels(kind, "miss").inc()
+        return MISSING
+
+    def _read_through(self, key: str, load: Callable[[], Any]) -> Any:
+        """Return a key's value from the caches or, on a miss, from load()."""
+        value = self._lookup(key)
+        if value is MISSING:
+            value = load()
+            self._write(key, value)
+        return value
+
+    def _write(self, key: str, value: Any):
+        """Store a value in every layer."""
+        self.local.set(key, value)
+        if self.shared:
+            try:
+                self.shared.set(key, value)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed: {e}")
+
+    def _delete(self, key: str):
+        """Drop a key from every layer."""
+        self.local.delete(key)
+        if self.shared:
+            try:
+                self.shared.delete(key)
+            except Exception as e:
+                logger.warning(f"Shared cache delete failed: {e}")
+
+    def article_id(self, url: str, load: Callable[[], Optional[int]]) -> Optional[int]:
+        """
+        Return the ID of the article stored under a URL.
+
+        Args:
+            url: Canonical article URL
+            load: Queries the database on a miss
+
+        Returns:
+            Article ID, or None if not stored
+        """
+        return self._read_through(f"url:{url}", load)
+
+    async def article_id_async(self, url: str, load: Callable[[], Awaitable[Optional[int]]]) -> Optional[int]:
+        """
+        Return the ID of the article stored under a URL, for async callers.
+
+        Args:
+            url: Canonical article URL
+            load: Coroutine function querying the database on a miss
+
+        Returns:
+            Article ID, or None if not stored
+        """
+        key = f"url:{url}"
+        value = self._lookup(key)
+        if value is MISSING:
+            value = await load()
+            self._write(key, value)
+        return value
+
+    def anchor_status(self, content_hash: str,
+                      load: Callable[[], Optional[AnchorStatus]]) -> Optional[AnchorStatus]:
+        """
+        Return where a content hash is stored and whether it is anchored.
+
+        Args:
+            content_hash: Hex content hash
+            load: Queries the database on a miss
+
+        Returns:
+            Anchor status, or None if no article or revision has this hash
+        """
+        value = self._read_through(f"hash:{content_hash}", load)
+        return AnchorStatus(*value) if value is not None else None
+
+    def stored(self, url: str, article_id: int, content_hash: str):
+        """
+        Record a newly stored article.
+
+        Args:
+            url: Canonical article URL
+            article_id: Article ID
+            content_hash: Hex content hash
+        """
+        self._write(f"url:{url}", article_id)
+        self._delete(f"hash:{content_hash}")
+
+    def invalidate_hash(self, content_hash: str):
+        """
+        Drop the cached status of a content hash, e.g. after anchoring it.
+
+        Args:
+            content_hash: Hex content hash
+        """
+        self._delete(f"hash:{content_hash}")
+
+def load_anchor_status(cursor, content_hash: str) -> Optional[AnchorStatus]:
+    """
+    Query where a content hash is stored and whether it is anchored.
+
+    Args:
+        cursor: psycopg2 cursor
+        content_hash: Hex content hash
+
+    Returns:
+        Status of the article with this hash, else of the revision with it,
+        or None if neither exists
+    """
+    cursor.execute(
+        "SELECT id, NULL, blockchain_tx_hash FROM articles WHERE content_hash = %s ORDER BY id LIMIT 1",
+        (content_hash,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute(
+            "SELECT article_id, id, blockchain_tx_hash FROM article_revisions WHERE content_hash = %s "
+            "ORDER BY id LIMIT 1",
+            (content_hash,)
+        )
+        row = cursor.fetchone()
+    return AnchorStatus(*row) if row else None
+
+# Cache shared by every crawl cycle in the process
+ARTICLE_CACHE = ArticleCache.from_env()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Crawler Command Line
+
+One entry point for the crawler and its maintenance jobs:
+
+    python cli.py crawl-once                # one crawl cycle, then exit
+    python cli.py daemon                    # crawl now and every 6 hours
+    python cli.py seed --count 20           # store the sample articles
+    python cli.py anchor-pending --limit 50 # anchor stored, unanchored articles
+    python cli.py revisit --limit 200       # re-fetch due articles, record edits
+    python cli.py enrich --workers 4        # tag articles with keywords and entities
+    python cli.py status URL_OR_HASH        # show whether an article is stored and anchored
+    python cli.py verify [--chain]          # recheck stored content hashes
+    python cli.py reindex                   # rebuild the article indexes
+    python cli.py bench --articles 50       # benchmark against the fake publisher
+
+Every command reads the same .env (or --env-file) and borrows its database
+connection from the shared pool in db.py. Modules are imported inside each
+command, so commands that don't crawl or anchor never load newspaper or
+web3 and start almost instantly.
+"""
+
+import sys
+import logging
+import argparse
+
+logger = logging.getLogger("cli")
+
+def _configure(args: argparse.Namespace):
+    """Load the environment file and set up logging before any settings are read."""
+    from dotenv import load_dotenv
+    if args.env_file:
+        load_dotenv(args.env_file, override=True)
+
+    if args.command == "bench":
+        # Keep per-article log lines out of the measurement
+        logging.basicConfig(level=logging.WARNING)
+    else:
+        from logconfig import configure_logging
+        configure_logging(args.log_file)
+
+def _start_observability():
+    """Start the metrics endpoint and tracer for crawling commands."""
+    from metrics import start_metrics_server
+    from tracing import setup_tracing
+    start_metrics_server()
+    setup_tracing()
+
+def cmd_crawl_once(args: argparse.Namespace) -> int:
+    """Run a single crawl cycle."""
+    from db import pooled_connection
+    from crawler import run_crawler
+
+    _start_observability()
+    with pooled_connection() as conn:
+        if args.profile:
+            from profiling import profile_run
+            profile_run(lambda: run_crawler(conn), args.profile, args.profile_mode)
+        else:
+            run_crawler(conn)
+    return 0
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    """Crawl on a schedule, reusing one pooled connection per cycle."""
+    from db import pooled_connection
+    from crawler import run_crawler, run_schedule
+
+    def job():
+        with pooled_connection() as conn:
+            run_crawler(conn)
+
+    _start_observability()
+    run_schedule(job)
+    return 0
+
+def cmd_seed(args: argparse.Namespace) -> int:
+    """Store the sample articles."""
+    from db import pooled_connection
+    from article_scraper import ArticleScraper
+
+    with pooled_connection() as conn:
+        scraper = ArticleScraper(conn)
+        if args.use_async:
+            import asyncio
+            asyncio.run(scraper.store_sample_articles_async(target_count=args.count))
+        else:
+            scraper.store_sample_articles(target_count=args.count)
+        scraper.close()
+    return 0
+
+def cmd_anchor_pending(args: argparse.Namespace) -> int:
+    """Anchor stored articles that have no blockchain transaction."""
+    from db import pooled_connection
+    from crawler import PalestineNewsCrawler
+
+    with pooled_connection() as conn:
+        crawler = PalestineNewsCrawler(conn)
+        try:
+            if not crawler.contract:
+                logger.error("Blockchain integration is not configured")
+                return 1
+            crawler.anchor_pending(args.limit)
+        finally:
+            crawler.close()
+    return 0
+
+def cmd_revisit(args: argparse.Namespace) -> int:
+    """Re-fetch stored articles that are due and record their edits."""
+    from db import pooled_connection
+    from crawler import PalestineNewsCrawler
+
+    _start_observability()
+    with pooled_connection() as conn:
+        crawler = PalestineNewsCrawler(conn)
+        try:
+            outcomes = crawler.revisit_articles(args.limit) if args.limit is not None else crawler.revisit_articles()
+        finally:
+            crawler.close()
+    return 1 if outcomes.get("failed") else 0
+
+def cmd_enrich(args: argparse.Namespace) -> int:
+    """Tag untagged articles with keywords and entities."""
+    from db import pooled_connection
+    from enrichment import ENRICHMENT_WORKERS, enrich_articles
+    from migrations import apply_migrations
+
+    with pooled_connection() as conn:
+        apply_migrations(conn)
+        enrich_articles(conn, args.limit, args.workers or ENRICHMENT_WORKERS)
+    return 0
+
+def cmd_status(args: argparse.Namespace) -> int:
+    """Show whether an article URL or content hash is stored and anchored."""
+    from cache import ARTICLE_CACHE, load_anchor_status
+    from db import pooled_connection
+    from urlnorm import canonicalize_url
+
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            if "://" in args.key:
+                # Stored URLs are canonical, e.g. without tracking parameters
+                url = canonicalize_url(args.key)
+                if url is None:
+                    print(f"not an http(s) URL: {args.key}")
+                    return 2
+
+                def load():
+                    cursor.execute("SELECT id FROM articles WHERE source_url = %s", (url,))
+                    row = cursor.fetchone()
+                    return row[0] if row else None
+                article_id = ARTICLE_CACHE.article_id(url, load)
+                if article_id is None:
+                    print("not stored")
+                    return 1
+                cursor.execute("SELECT content_hash FROM articles WHERE id = %s", (article_id,))
+                content_hash = cursor.fetchone()[0]
+            else:
+                content_hash = args.key.lower()
+            status = ARTICLE_CACHE.anchor_status(content_hash, lambda: load_anchor_status(cursor, content_hash))
+        conn.rollback()
+
+    if status is None:
+        print("not stored")
+        return 1
+    kind = f"revision {status.revision_id} of article" if status.revision_id else "article"
+    print(f"{content_hash}: {kind} {status.article_id}, "
+          f"{'anchored in ' + status.tx_hash if status.tx_hash else 'not anchored'}")
+    return 0
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    """Recheck stored content hashes, optionally against the chain."""
+    from db import pooled_connection
+    from verify import verify_articles
+
+    with pooled_connection() as conn:
+        contract = None
+        if args.chain:
+            from crawler import connect_blockchain
+            _, contract = connect_blockchain()
+            if not contract:
+                logger.error("Blockchain integration is not configured")
+                return 1
+        outcomes = verify_articles(conn, contract, source=args.source, limit=args.limit)
+    failures = sum(count for outcome, count in outcomes.items() if outcome != "ok")
+    return 1 if failures else 0
+
+# Every table the crawler writes per article, in schema order
+REINDEX_TABLES = (
+    "articles", "article_urls", "article_blobs", "article_revisions", "article_fetch_state",
+    "article_enrichment", "article_keywords", "article_entities", "media", "article_media",
+)
+
+def cmd_reindex(args: argparse.Namespace) -> int:
+    """Rebuild the indexes of the article tables."""
+    from db import pooled_connection
+    from migrations import apply_migrations
+
+    with pooled_connection() as conn:
+        apply_migrations(conn)
+        # REINDEX CONCURRENTLY can't run inside a transaction block
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                for table in REINDEX_TABLES:
+                    # article_urls only exists once articles is partitioned
+                    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+                    if not cursor.fetchone()[0]:
+                        continue
+                    concurrently = "CONCURRENTLY " if args.concurrently else ""
+                    logger.info(f"Reindexing {table}")
+                    cursor.execute(f"REINDEX TABLE {concurrently}{table}")
+        finally:
+            conn.autocommit = False
+    return 0
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Benchmark the crawler against the local fake publisher."""
+    from benchmark import report, run_benchmark, run_startup_benchmark
+
+    if args.startup:
+        report(run_startup_benchmark(args), args.json)
+    else:
+        report(run_benchmark(args), args.json)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with one subparser per command."""
+    parser = argparse.ArgumentParser(description="Palestine News Hub crawler")
+    parser.add_argument("--env-file", help="read settings from this file instead of .env")
+    parser.add_argument("--log-file", default="crawler.log", help="rotating JSON log file (default: crawler.log)")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    crawl_once = commands.add_parser("crawl-once", help="run one crawl cycle and exit")
+    crawl_once.add_argument("--profile", metavar="DIR", help="profile the cycle and write results to DIR")
+    crawl_once.add_argument("--profile-mode", choices=["sample", "cprofile"], default="sample",
+                            help="sampling wall/CPU profiler or cProfile, covering worker threads (default: sample)")
+    crawl_once.set_defaults(handler=cmd_crawl_once)
+
+    daemon = commands.add_parser("daemon", help="crawl now and every 6 hours")
+    daemon.set_defaults(handler=cmd_daemon)
+
+    seed = commands.add_parser("seed", help="store the sample articles")
+    seed.add_argument("--count", type=int, default=20, help="number of sample articles to store")
+    seed.add_argument("--async", dest="use_async", action="store_true",
+                      help="store them in one binary COPY batch through asyncpg")
+    seed.set_defaults(handler=cmd_seed)
+
+    anchor = commands.add_parser("anchor-pending", help="anchor stored articles without a transaction")
+    anchor.add_argument("--limit", type=int, help="maximum number of articles to anchor")
+    anchor.set_defaults(handler=cmd_anchor_pending)
+
+    revisit = commands.add_parser("revisit", help="re-fetch due articles and record their edits")
+    revisit.add_argument("--limit", type=int, help="maximum number of articles to re-fetch (default: REVISIT_BATCH)")
+    revisit.set_defaults(handler=cmd_revisit)
+
+    enrich = commands.add_parser("enrich", help="tag articles with keywords and entities")
+    enrich.add_argument("--limit", type=int, help="maximum number of articles to tag, newest first")
+    enrich.add_argument("--workers", type=int, help="worker processes (default: ENRICHMENT_WORKERS or CPU count)")
+    enrich.set_defaults(handler=cmd_enrich)
+
+    status = commands.add_parser("status", help="show whether an article is stored and anchored")
+    status.add_argument("key", help="canonical article URL or hex content hash")
+    status.set_defaults(handler=cmd_status)
+
+    verify = commands.add_parser("verify", help="recheck stored content hashes")
+    verify.add_argument("--source", help="only check articles from this source")
+    verify.add_argument("--limit", type=int, help="only check the newest N articles")
+    verify.add_argument("--chain", action="store_true", help="also check anchored hashes on chain")
+    verify.set_defaults(handler=cmd_verify)
+
+    reindex = commands.add_parser(
+        "reindex",
+        help="rebuild the indexes of the article, blob, revision, fetch state, enrichment and media tables"
+    )
+    reindex.add_argument("--concurrently", action="store_true",
+                         help="rebuild without blocking writes (slower, PostgreSQL 12+)")
+    reindex.set_defaults(handler=cmd_reindex)
+
+    bench = commands.add_parser("bench", help="benchmark against the local fake publisher")
+    # Imported for its options only; benchmark.py loads the crawler lazily
+    from benchmark import add_arguments
+    add_arguments(bench)
+    bench.set_defaults(handler=cmd_bench)
+
+    return parser
+
+def main() -> int:
+    """Main function to dispatch a crawler command."""
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.command == "bench" and args.rpc and not (args.contract and args.private_key):
+        parser.error("--rpc requires --contract and --private-key")
+
+    _configure(args)
+    try:
+        return args.handler(args)
+    finally:
+        from db import close_pool
+        close_pool()
+
+if __name__ == "__main__":
+    sys.exit(main())
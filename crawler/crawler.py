@@ -8,167 +8,336 @@ and on the Polygon blockchain.
 """
 
 import os
-import hashlib
 import json
 import time
 import logging
+import argparse
 import schedule
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 import requests
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from bs4 import BeautifulSoup
-from newspaper import Article
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-from web3 import Web3
+
+from archive import ArchiveWriter, ARCHIVE_DIR
+from asyncstore import AsyncArticleStore
+from blobstore import BlobStore, blob_storage_enabled
+from cache import ARTICLE_CACHE
+from db import connect
+from enrichment import ENRICHMENT_ENABLED, enrich_articles
+from extraction import decode_html, parse_article
+from links import extract_links
+from logconfig import configure_logging
+from media import MEDIA_ENABLED, MediaHarvester
+from metrics import ARTICLES, ANCHOR_LAG_SECONDS, LINKS_FOUND, URL_FILTER_CHECKS, start_metrics_server, time_stage
+from migrations import apply_migrations
+from partitions import PartitionManager, is_partitioned
+from ratelimit import RateLimiter
+from records import ArticleRecord, naive_utc
+from relevance import RELEVANCE_FILTER, check_relevance
+from resilience import CircuitOpenError, Resilience
+from revisions import REVISIT_BATCH, DueArticle, due_articles, record_check, store_revision
+from robots import ROBOTS, USER_AGENT
+from sources import REGISTRY, Source
+from tracing import in_current_context, setup_tracing, span
+from urlfilter import KNOWN_URLS, REJECTED_URLS
+from urlnorm import canonicalize_url
 
 # Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("crawler.log"),
-        logging.StreamHandler()
-    ]
-)
+configure_logging("crawler.log")
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
-# Database connection parameters
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME", "palestine_news")
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
-
 # Blockchain connection parameters
 POLYGON_RPC = os.getenv("POLYGON_RPC", "https://polygon-rpc.com")
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY", "")
 
-# Trusted news sources
-TRUSTED_SOURCES = [
-    {
-        "name": "Al Jazeera",
-        "url": "https://www.aljazeera.com/tag/palestine/",
-        "article_selector": "article.gc a",
-        "base_url": "https://www.aljazeera.com"
-    },
-    {
-        "name": "Middle East Eye",
-        "url": "https://www.middleeasteye.net/topics/palestine",
-        "article_selector": "article.teaser h3 a",
-        "base_url": "https://www.middleeasteye.net"
-    }
-]
+# Default politeness delay between article downloads, for sources
+# without their own rate in sources.toml
+CRAWL_DELAY_SECONDS = float(os.getenv("CRAWL_DELAY_SECONDS", "2"))
+
+# Connections kept open per host, enough for the most concurrent source
+HTTP_POOL_SIZE = 32
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+def connect_blockchain() -> Tuple[Any, Any]:
+    """
+    Connect to Polygon and load the verifier contract, without a database
+    or anything else the crawler sets up.
+    
+    Returns:
+        (web3, contract); either is None if unavailable
+    """
+    web3 = None
+    try:
+        if not CONTRACT_ADDRESS or not PRIVATE_KEY:
+            logger.warning("Blockchain integration disabled: missing contract address or private key")
+            return None, None
+        
+        # Imported here: web3 takes seconds to load and isn't needed
+        # when blockchain integration is disabled
+        from web3 import Web3
+        
+        web3 = Web3(Web3.HTTPProvider(POLYGON_RPC))
+        if not web3.is_connected():
+            logger.error("Failed to connect to Polygon network")
+            return web3, None
+        
+        logger.info(f"Connected to Polygon: {web3.is_connected()}")
+        
+        # Load contract ABI
+        try:
+            with open('contract_abi.json', 'r') as f:
+                contract_abi = json.load(f)
+            contract = web3.eth.contract(
+                address=CONTRACT_ADDRESS,
+                abi=contract_abi
+            )
+            logger.info("Contract loaded successfully")
+            return web3, contract
+        except Exception as e:
+            logger.error(f"Failed to load contract: {e}")
+    except Exception as e:
+        logger.error(f"Blockchain setup error: {e}")
+    return web3, None
 
 class PalestineNewsCrawler:
     """Web crawler for Palestine news articles."""
     
-    def __init__(self):
-        """Initialize the crawler with database and blockchain connections."""
-        self.conn = None
+    def __init__(self, conn=None):
+        """
+        Initialize the crawler with database and blockchain connections.
+        
+        Args:
+            conn: Existing connection to use, e.g. from the pool; the crawler
+                opens and closes its own if omitted
+        """
+        self.conn = conn
+        self.owns_conn = conn is None
+        self.blobs = None
+        self.partitions = None
+        self.known_urls = None
+        self.cache = ARTICLE_CACHE
+        self.media = None
         self.web3 = None
         self.contract = None
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.resilience = Resilience()
+        # Canonical URLs already handled in this run, across all sources
+        self.seen: Set[str] = set()
+        self.seen_lock = threading.Lock()
+        self.db_lock = threading.RLock()
+        self.chain_lock = threading.Lock()
+        self.archive = ArchiveWriter(ARCHIVE_DIR) if ARCHIVE_DIR else None
         self.setup_database()
+        self.setup_media()
         self.setup_blockchain()
     
     def setup_database(self):
         """Set up the PostgreSQL database connection."""
         try:
-            self.conn = psycopg2.connect(
-                host=DB_HOST,
-                port=DB_PORT,
-                dbname=DB_NAME,
-                user=DB_USER,
-                password=DB_PASSWORD
-            )
-            logger.info("Connected to PostgreSQL database")
+            if self.conn is None:
+                self.conn = connect()
+                logger.info("Connected to PostgreSQL database")
             
-            # Create articles table if it doesn't exist
-            with self.conn.cursor() as cursor:
-                cursor.execute("""
-                CREATE TABLE IF NOT EXISTS articles (
-                    id SERIAL PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    source_url TEXT NOT NULL UNIQUE,
-                    source_name TEXT NOT NULL,
-                    publication_date TIMESTAMP,
-                    content_text TEXT,
-                    content_hash TEXT NOT NULL,
-                    blockchain_tx_hash TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-                """)
-                self.conn.commit()
-                logger.info("Articles table created or already exists")
+            applied = apply_migrations(self.conn)
+            if applied:
+                logger.info(f"Applied {applied} schema migrations")
+            
+            if blob_storage_enabled():
+                self.blobs = BlobStore(self.conn)
+                logger.info("Storing article bodies in the blob table")
+            
+            if is_partitioned(self.conn):
+                self.partitions = PartitionManager(self.conn)
+                self.partitions.ensure_upcoming()
+            
+            self.setup_url_filter()
         except Exception as e:
             logger.error(f"Database connection error: {e}")
             raise
     
-    def setup_blockchain(self):
-        """Set up the connection to the Polygon blockchain."""
+    def setup_url_filter(self):
+        """Top up the process-wide filter of stored URLs from the database."""
+        try:
+            loaded = KNOWN_URLS.refresh(self.conn)
+            self.known_urls = KNOWN_URLS
+            logger.info(f"Loaded {loaded} stored URLs into the URL filter ({len(KNOWN_URLS)} total)")
+        except Exception as e:
+            # Every existence check goes to the database instead
+            self.conn.rollback()
+            self.known_urls = None
+            logger.error(f"URL filter setup error: {e}")
+    
+    def setup_media(self):
+        """Start the image harvester if media collection is enabled."""
+        if not MEDIA_ENABLED or self.conn is None:
+            return
         try:
-            if not CONTRACT_ADDRESS or not PRIVATE_KEY:
-                logger.warning("Blockchain integration disabled: missing contract address or private key")
-                return
+            self.media = MediaHarvester(self.conn, self.db_lock, self.get, self.robots_allowed, self.host_limiter)
+            logger.info("Collecting article images")
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"Media setup error: {e}")
+    
+    def async_store(self, pool) -> AsyncArticleStore:
+        """
+        Return an asyncpg-backed store that writes articles like store_article,
+        for use from an asyncio fetch loop.
+        
+        Args:
+            pool: asyncpg Pool, e.g. from asyncstore.create_pool()
             
-            self.web3 = Web3(Web3.HTTPProvider(POLYGON_RPC))
-            if not self.web3.is_connected():
-                logger.error("Failed to connect to Polygon network")
-                return
+        Returns:
+            Store sharing this crawler's blob settings, partitions, URL filter and cache
+        """
+        return AsyncArticleStore(pool, self.blobs, self.partitions, self.known_urls, self.cache, self.db_lock)
+    
+    def setup_blockchain(self):
+        """Set up the connection to the Polygon blockchain."""
+        self.web3, self.contract = connect_blockchain()
+    
+    def fetch_article_links(self, source: Source) -> List[str]:
+        """
+        Fetch article links from a news source's index page and feeds.
+        
+        Of the source's selectors, the first one that matches anything wins.
+        Pages and feeds disallowed by robots.txt are not fetched.
+        
+        Args:
+            source: News source
             
-            logger.info(f"Connected to Polygon: {self.web3.is_connected()}")
+        Returns:
+            List of canonical article URLs
+        """
+        try:
+            with time_stage("fetch_links", source.name), span("fetch_index", url=source.url):
+                links = []
+                if self.robots_allowed(source.url):
+                    response = self.get(source.url)
+                    links = extract_links(response.text, source.selectors, source.base_url, source.parser,
+                                          page_url=response.url)
+                for feed_url in source.feeds:
+                    if self.robots_allowed(feed_url):
+                        links.extend(self.fetch_feed_links(feed_url))
+                links = list(dict.fromkeys(links))
             
-            # Load contract ABI
-            try:
-                with open('contract_abi.json', 'r') as f:
-                    contract_abi = json.load(f)
-                self.contract = self.web3.eth.contract(
-                    address=CONTRACT_ADDRESS,
-                    abi=contract_abi
-                )
-                logger.info("Contract loaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to load contract: {e}")
+            LINKS_FOUND.labels(source.name).inc(len(links))
+            logger.info("Found %d articles from %s", len(links), source.name, extra={"source": source.name})
+            return links
         except Exception as e:
-            logger.error(f"Blockchain setup error: {e}")
+            logger.error("Error fetching articles from %s: %s", source.name, e, extra={"source": source.name})
+            return []
     
-    def fetch_article_links(self, source: Dict[str, str]) -> List[str]:
+    def fetch_feed_links(self, feed_url: str) -> List[str]:
         """
-        Fetch article links from a news source.
+        Fetch article links from an RSS or Atom feed.
         
         Args:
-            source: Dictionary containing source information
+            feed_url: Feed URL
             
         Returns:
-            List of article URLs
+            List of canonical article URLs, empty if the feed can't be read
         """
         try:
-            response = requests.get(source["url"], timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.get(feed_url)
+            root = ElementTree.fromstring(response.content)
+        except (requests.RequestException, CircuitOpenError, ElementTree.ParseError) as e:
+            logger.error("Error fetching feed %s: %s", feed_url, e, extra={"url": feed_url})
+            return []
+        
+        links = []
+        for element in root.iter():
+            # RSS <item><link>url</link>, Atom <entry><link href="url"/>
+            if element.tag == "item":
+                link = element.findtext("link")
+                if link:
+                    links.append(link)
+            elif element.tag == f"{{{ATOM_NS}}}entry":
+                for link in element.findall(f"{{{ATOM_NS}}}link"):
+                    if link.get("rel", "alternate") == "alternate" and link.get("href"):
+                        links.append(link.get("href"))
+                        break
+        links = (canonicalize_url(link, feed_url) for link in links)
+        return [link for link in links if link]
+    
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False,
+            resilience: Optional[Resilience] = None) -> requests.Response:
+        """
+        GET a URL, retrying transient failures, through its host's circuit breaker.
+        
+        Args:
+            url: URL to fetch
+            headers: Extra request headers, e.g. for a conditional request
+            stream: Return before the body is read, e.g. to cap its size;
+                the caller must close the response
+            resilience: Retries and breakers to use instead of the crawler's
+            
+        Returns:
+            Successful or 304 response
             
-            links = []
-            for link in soup.select(source["article_selector"]):
-                href = link.get('href')
-                if href:
-                    # Handle relative URLs
-                    if href.startswith('/'):
-                        href = f"{source['base_url']}{href}"
-                    links.append(href)
+        Raises:
+            CircuitOpenError: If the host is suspended
+            requests.RequestException: If the request failed for good
+        """
+        def request() -> requests.Response:
+            response = self.session.get(url, headers=headers, timeout=30, stream=stream)
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                response.close()
+                raise
+            return response
+        
+        return (resilience or self.resilience).call(url, request)
+    
+    def fetch_html(self, url: str) -> str:
+        """
+        Download a page and append the raw response to the archive.
+        
+        Args:
+            url: Page URL
             
-            logger.info(f"Found {len(links)} articles from {source['name']}")
-            return links
-        except Exception as e:
-            logger.error(f"Error fetching articles from {source['name']}: {e}")
-            return []
+        Returns:
+            Decoded HTML
+        """
+        response = self.fetch(url)
+        return decode_html(response.content, response.headers)
     
-    def extract_article_data(self, url: str, source_name: str) -> Optional[Dict[str, Any]]:
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Download a page and append the raw response to the archive, unless
+        it is a 304 without a body.
+        
+        Args:
+            url: Page URL
+            headers: Extra request headers, e.g. for a conditional request
+            
+        Returns:
+            Response
+        """
+        response = self.get(url, headers)
+        if self.archive and response.status_code != 304:
+            try:
+                self.archive.write(url, response.status_code, response.headers.items(), response.content)
+            except OSError as e:
+                logger.error("Error archiving %s: %s", url, e, extra={"url": url})
+        return response
+    
+    def extract_article_data(self, url: str, source_name: str) -> Optional[ArticleRecord]:
         """
         Extract article data using newspaper3k.
         
@@ -177,83 +346,83 @@ class PalestineNewsCrawler:
             source_name: Name of the news source
             
         Returns:
-            Dictionary containing article data or None if extraction failed
+            Article record or None if extraction failed
         """
         try:
-            article = Article(url)
-            article.download()
-            article.parse()
-            
-            # Generate SHA-256 hash of the article content
-            content_hash = hashlib.sha256(article.text.encode()).hexdigest()
-            
-            # Extract publication date or use current time if not available
-            pub_date = article.publish_date or datetime.now()
-            
-            return {
-                "title": article.title,
-                "source_url": url,
-                "source_name": source_name,
-                "publication_date": pub_date,
-                "content_text": article.text,
-                "content_hash": content_hash
-            }
+            with time_stage("download", source_name), span("download", url=url):
+                html = self.fetch_html(url)
+            with time_stage("extract", source_name), span("parse", url=url):
+                return parse_article(url, html, source_name)
         except Exception as e:
-            logger.error(f"Error extracting data from {url}: {e}")
+            logger.error("Error extracting data from %s: %s", url, e, extra={"url": url, "source": source_name})
             return None
     
-    def store_article(self, article_data: Dict[str, Any]) -> Optional[int]:
+    def store_article(self, article_data: ArticleRecord) -> Optional[int]:
         """
         Store article data in PostgreSQL.
         
         Args:
-            article_data: Dictionary containing article data
+            article_data: Article record
             
         Returns:
             Article ID if successful, None otherwise
         """
-        try:
-            with self.conn.cursor() as cursor:
-                # Check if article already exists
-                cursor.execute(
-                    "SELECT id FROM articles WHERE source_url = %s",
-                    (article_data["source_url"],)
-                )
-                existing = cursor.fetchone()
-                if existing:
-                    logger.info(f"Article already exists: {article_data['title']}")
-                    return existing[0]
+        with self.db_lock:
+            try:
+                if self.partitions:
+                    self.partitions.ensure_for(naive_utc(article_data.publication_date))
+            
+                with time_stage("store", article_data.source_name), span("db_insert"):
+                    with self.conn.cursor() as cursor:
+                        # Check if article already exists
+                        cursor.execute(
+                            "SELECT id FROM articles WHERE source_url = %s",
+                            (article_data.source_url,)
+                        )
+                        existing = cursor.fetchone()
+                        if existing:
+                            if self.known_urls is not None:
+                                self.known_urls.add(article_data.source_url)
+                            self.cache.stored(article_data.source_url, existing[0], article_data.content_hash_hex)
+                            logger.info("Article already exists: %s", article_data.title,
+                                        extra={"url": article_data.source_url, "sample": "article_exists"})
+                            return existing[0]
                 
-                # Insert new article
-                cursor.execute("""
-                INSERT INTO articles (
-                    title, source_url, source_name, publication_date,
-                    content_text, content_hash
-                ) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
-                """, (
-                    article_data["title"],
-                    article_data["source_url"],
-                    article_data["source_name"],
-                    article_data["publication_date"],
-                    article_data["content_text"],
-                    article_data["content_hash"]
-                ))
-                article_id = cursor.fetchone()[0]
-                self.conn.commit()
-                logger.info(f"Stored article: {article_data['title']} (ID: {article_id})")
-                return article_id
-        except Exception as e:
-            self.conn.rollback()
-            logger.error(f"Error storing article: {e}")
-            return None
+                        content_text = article_data.content_text
+                        if self.blobs:
+                            self.blobs.put(cursor, article_data.content_hash_hex, content_text)
+                            content_text = None
+                
+                        # Insert new article
+                        cursor.execute("""
+                        INSERT INTO articles (
+                            title, source_url, source_name, publication_date,
+                            content_text, content_hash
+                        ) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
+                        """, article_data.db_row(content_text))
+                        article_id = cursor.fetchone()[0]
+                        self.conn.commit()
+                        if self.known_urls is not None:
+                            self.known_urls.add(article_data.source_url)
+                        self.cache.stored(article_data.source_url, article_id, article_data.content_hash_hex)
+                        logger.info("Stored article: %s (ID: %d)", article_data.title, article_id,
+                                    extra={"article_id": article_id, "source": article_data.source_name})
+                        return article_id
+            except Exception as e:
+                self.conn.rollback()
+                logger.error("Error storing article: %s", e, extra={"url": article_data.source_url})
+                return None
     
-    def submit_to_blockchain(self, article_id: int, article_data: Dict[str, Any]) -> bool:
+    def submit_to_blockchain(self, article_id: int, article_data: ArticleRecord,
+                             revision_id: Optional[int] = None) -> bool:
         """
         Submit article hash to Polygon blockchain.
         
         Args:
             article_id: Article ID in the database
-            article_data: Dictionary containing article data
+            article_data: Article record
+            revision_id: Revision the hash belongs to, if it is an edited
+                version of the article
             
         Returns:
             True if successful, False otherwise
@@ -263,91 +432,554 @@ class PalestineNewsCrawler:
             return False
         
         try:
-            account = self.web3.eth.account.from_key(PRIVATE_KEY)
+            # One transaction at a time: each takes the account's next nonce
+            with self.chain_lock, time_stage("anchor", article_data.source_name), \
+                    span("anchor", article_id=article_id):
+                account = self.web3.eth.account.from_key(PRIVATE_KEY)
+                
+                # Prepare transaction
+                with span("tx_build"):
+                    tx = self.contract.functions.storeArticleHash(
+                        article_data.content_hash_hex,
+                        article_data.source_url,
+                        int(article_data.publication_date.timestamp())
+                    ).build_transaction({
+                        'from': account.address,
+                        'nonce': self.web3.eth.get_transaction_count(account.address),
+                        'gas': 200000,
+                        'gasPrice': self.web3.eth.gas_price
+                    })
+                
+                # Sign and send transaction
+                with span("tx_send"):
+                    signed_tx = self.web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
+                    tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+                with span("tx_receipt", tx_hash=tx_hash.hex()):
+                    tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+                
+                # Update database with transaction hash
+                with self.db_lock, self.conn.cursor() as cursor:
+                    if revision_id is None:
+                        cursor.execute(
+                            """
+                            UPDATE articles SET blockchain_tx_hash = %s WHERE id = %s
+                            RETURNING EXTRACT(EPOCH FROM LOCALTIMESTAMP - created_at)
+                            """,
+                            (tx_hash.hex(), article_id)
+                        )
+                        lag = cursor.fetchone()[0]
+                    else:
+                        cursor.execute(
+                            "UPDATE article_revisions SET blockchain_tx_hash = %s WHERE id = %s",
+                            (tx_hash.hex(), revision_id)
+                        )
+                        lag = None
+                    self.conn.commit()
+                self.cache.invalidate_hash(article_data.content_hash_hex)
+                if lag is not None:
+                    ANCHOR_LAG_SECONDS.labels(article_data.source_name).observe(float(lag))
+            
+            logger.info("Article hash stored on blockchain: %s", tx_hash.hex(),
+                        extra={"article_id": article_id, "tx_hash": tx_hash.hex()})
+            return True
+        except Exception as e:
+            logger.error("Error submitting to blockchain: %s", e, extra={"article_id": article_id})
+            return False
+    
+    def crawl_sources(self, sources: Optional[List[Source]] = None):
+        """
+        Crawl news sources for articles, highest priority first.
+        
+        Args:
+            sources: Sources to crawl, the enabled registry sources if omitted
+        """
+        # Each run starts with an empty seen-set; the database check
+        # catches articles stored by earlier runs
+        with self.seen_lock:
+            self.seen.clear()
+        for source in sources if sources is not None else REGISTRY.sources():
+            with span("crawl_source", source=source.name):
+                self.crawl_source(source)
+    
+    def crawl_source(self, source: Source):
+        """
+        Crawl one source for new articles.
+        
+        Up to source.concurrency articles are downloaded and extracted at
+        once; database writes and anchoring are serialized.
+        
+        Args:
+            source: News source
+        """
+        logger.info("Crawling %s...", source.name, extra={"source": source.name})
+        # Drop links already handled in this run or disallowed by robots.txt
+        # before any request or query
+        article_links = []
+        for url in self.fetch_article_links(source):
+            if not self.first_seen(url):
+                continue
+            if not self.robots_allowed(url):
+                ARTICLES.labels(source.name, "disallowed").inc()
+                continue
+            article_links.append(url)
+        
+        # Space out requests to avoid overwhelming the server
+        self.limiters[source.name] = self.build_limiter(source)
+        
+        def crawl_article(url: str):
+            with span("article", url=url, source=source.name):
+                self.process_article(url, source)
+        
+        if source.concurrency > 1:
+            with ThreadPoolExecutor(source.concurrency, thread_name_prefix="article") as pool:
+                list(pool.map(in_current_context(crawl_article), article_links))
+        else:
+            for url in article_links:
+                crawl_article(url)
+    
+    def build_limiter(self, source: Source) -> RateLimiter:
+        """
+        Build the rate limiter for a source's requests.
+        
+        Args:
+            source: News source
+            
+        Returns:
+            Limiter at the source's rate, or the publisher's robots.txt
+            delay if that is slower
+        """
+        rate = source.rate if source.rate is not None else (
+            1 / CRAWL_DELAY_SECONDS if CRAWL_DELAY_SECONDS > 0 else 0
+        )
+        # The publisher's own Crawl-delay or Request-rate applies if it is slower
+        robots_delay = ROBOTS.delay(source.url, self.session)
+        if robots_delay:
+            rate = min(rate, 1 / robots_delay) if rate else 1 / robots_delay
+            logger.info("Using robots.txt delay of %.1fs for %s", robots_delay, source.name,
+                        extra={"source": source.name})
+        return RateLimiter(rate)
+    
+    def limiter_for(self, source_name: str, url: str) -> RateLimiter:
+        """
+        Return the rate limiter of a source, building it if no crawl has yet.
+        
+        Args:
+            source_name: Source name as stored with the article
+            url: Article URL, for the robots.txt delay of a source no longer
+                in the registry
             
-            # Prepare transaction
-            tx = self.contract.functions.storeArticleHash(
-                article_data["content_hash"],
-                article_data["source_url"],
-                int(article_data["publication_date"].timestamp())
-            ).build_transaction({
-                'from': account.address,
-                'nonce': self.web3.eth.get_transaction_count(account.address),
-                'gas': 200000,
-                'gasPrice': self.web3.eth.gas_price
-            })
+        Returns:
+            Rate limiter shared by every request to the source
+        """
+        limiter = self.limiters.get(source_name)
+        if limiter is None:
+            source = next((source for source in REGISTRY.sources() if source.name == source_name), None)
+            if source is None:
+                source = Source(name=source_name, url=url, selectors=())
+            limiter = self.limiters.setdefault(source_name, self.build_limiter(source))
+        return limiter
+    
+    def host_limiter(self, url: str) -> Optional[RateLimiter]:
+        """
+        Return the rate limiter of the source a URL's host belongs to.
+        
+        Args:
+            url: Any URL, e.g. of an article image
             
-            # Sign and send transaction
-            signed_tx = self.web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        Returns:
+            The source's limiter, or None if no source is on the host
+        """
+        host = urlsplit(url).hostname
+        for source in REGISTRY.sources():
+            if urlsplit(source.url).hostname == host:
+                return self.limiter_for(source.name, source.url)
+        return None
+    
+    def robots_allowed(self, url: str) -> bool:
+        """
+        Check a URL against its host's cached robots.txt.
+        
+        Args:
+            url: URL about to be fetched
+            
+        Returns:
+            True if our user agent may fetch it
+        """
+        if ROBOTS.allowed(url, self.session):
+            return True
+        logger.info("Disallowed by robots.txt: %s", url, extra={"url": url, "sample": "robots_disallowed"})
+        return False
+    
+    def first_seen(self, url: str) -> bool:
+        """
+        Record a canonical URL as handled in this run.
+        
+        Args:
+            url: Canonical article URL
+            
+        Returns:
+            True if the URL had not been seen yet in this run
+        """
+        with self.seen_lock:
+            if url in self.seen:
+                return False
+            self.seen.add(url)
+            return True
+    
+    def article_exists(self, url: str) -> bool:
+        """
+        Check whether an article is already stored under a URL.
+        
+        URLs the filter has never seen are new without asking the database;
+        the rest are answered by the lookup cache or confirmed with a query.
+        
+        Args:
+            url: Canonical article URL
             
-            # Update database with transaction hash
-            with self.conn.cursor() as cursor:
+        Returns:
+            True if the article is stored
+        """
+        if self.known_urls is not None and not self.known_urls.might_contain(url):
+            URL_FILTER_CHECKS.labels("miss").inc()
+            return False
+        
+        def load() -> Optional[int]:
+            with self.db_lock, self.conn.cursor() as cursor:
                 cursor.execute(
-                    "UPDATE articles SET blockchain_tx_hash = %s WHERE id = %s",
-                    (tx_hash.hex(), article_id)
+                    "SELECT id FROM articles WHERE source_url = %s",
+                    (url,)
                 )
-                self.conn.commit()
+                row = cursor.fetchone()
+            return row[0] if row else None
+        
+        stored = self.cache.article_id(url, load) is not None
+        if self.known_urls is not None:
+            URL_FILTER_CHECKS.labels("stored" if stored else "false_positive").inc()
+        return stored
+    
+    def process_article(self, url: str, source: Source) -> bool:
+        """
+        Download, store and anchor a single article unless it is already stored.
+        
+        Args:
+            url: Article URL
+            source: News source
             
-            logger.info(f"Article hash stored on blockchain: {tx_hash.hex()}")
-            return True
-        except Exception as e:
-            logger.error(f"Error submitting to blockchain: {e}")
+        Returns:
+            True if the article was downloaded, False if it was skipped
+        """
+        # Check if article already exists or was found irrelevant before
+        if REJECTED_URLS.might_contain(url):
+            ARTICLES.labels(source.name, "skipped").inc()
             return False
+        if self.article_exists(url):
+            ARTICLES.labels(source.name, "skipped").inc()
+            logger.info("Skipping existing article: %s", url, extra={"url": url, "sample": "skip_existing"})
+            return False
+        
+        # Don't wait for a slot on a host that is suspended anyway
+        if self.resilience.breaker(url).is_open:
+            ARTICLES.labels(source.name, "suspended").inc()
+            logger.info("Skipping %s, host suspended", url, extra={"url": url, "sample": "skip_suspended"})
+            return False
+        
+        # Extract and store article data
+        limiter = self.limiters.get(source.name)
+        if limiter:
+            limiter.wait()
+        article_data = self.extract_article_data(url, source.name)
+        if not article_data:
+            ARTICLES.labels(source.name, "failed").inc()
+            return True
+        
+        # The page may declare another URL as its canonical one
+        canonical = article_data.source_url
+        if canonical != url and (not self.first_seen(canonical) or self.article_exists(canonical)):
+            ARTICLES.labels(source.name, "duplicate").inc()
+            logger.info("Skipping %s, a duplicate of %s", url, canonical,
+                        extra={"url": url, "sample": "skip_duplicate"})
+            return True
+        
+        # Drop off-topic and foreign-language articles before any write or transaction
+        if RELEVANCE_FILTER:
+            verdict = check_relevance(article_data)
+            if not verdict.relevant:
+                REJECTED_URLS.add(url)
+                ARTICLES.labels(source.name, "irrelevant").inc()
+                logger.info("Dropping irrelevant article %s (%s)", url, verdict.reason,
+                            extra={"url": url, "language": verdict.language, "sample": "irrelevant"})
+                return True
+        
+        article_id = self.store_article(article_data)
+        ARTICLES.labels(source.name, "stored" if article_id else "failed").inc()
+        if article_id and self.media:
+            self.media.submit(article_id, source.name, article_data.image_urls)
+        if article_id and self.web3 and self.contract:
+            self.submit_to_blockchain(article_id, article_data)
+        return True
     
-    def crawl_sources(self):
-        """Crawl all trusted sources for articles."""
-        for source in TRUSTED_SOURCES:
-            logger.info(f"Crawling {source['name']}...")
-            article_links = self.fetch_article_links(source)
+    def anchor_pending(self, limit: Optional[int] = None) -> int:
+        """
+        Submit stored articles, then article revisions, that have no
+        blockchain transaction yet.
+    
+        Args:
+            limit: Maximum number of articles and revisions to submit, oldest first
+    
+        Returns:
+            Number of articles anchored
+        """
+        if not self.web3 or not self.contract:
+            logger.warning("Blockchain integration disabled")
+            return 0
+    
+        with self.conn.cursor() as cursor:
+            cursor.execute("""
+            SELECT id, NULL, title, source_url, source_name, publication_date, content_hash
+            FROM articles
+            WHERE blockchain_tx_hash IS NULL AND on_chain_at IS NULL AND publication_date IS NOT NULL
+            ORDER BY id
+            LIMIT %s
+            """, (limit,))
+            pending = cursor.fetchall()
+            if limit is None or len(pending) < limit:
+                cursor.execute("""
+                SELECT a.id, r.id, r.title, a.source_url, a.source_name, a.publication_date, r.content_hash
+                FROM article_revisions r
+                JOIN articles a ON a.id = r.article_id
+                WHERE r.blockchain_tx_hash IS NULL AND r.on_chain_at IS NULL
+                  AND a.publication_date IS NOT NULL
+                ORDER BY r.id
+                LIMIT %s
+                """, (None if limit is None else limit - len(pending),))
+                pending += cursor.fetchall()
+        self.conn.commit()
+        
+        anchored = 0
+        for article_id, revision_id, title, url, source_name, publication_date, content_hash in pending:
+            try:
+                article = ArticleRecord.from_db(title, url, source_name, publication_date, None, content_hash)
+            except ValueError as e:
+                logger.error("Article %d has an invalid content hash: %s", article_id, e,
+                             extra={"article_id": article_id})
+                continue
+            # The contract rejects hashes it already holds, e.g. when the
+            # receipt arrived but the database update failed
+            if self.contract.functions.isArticleHashStored(article.content_hash_hex).call():
+                logger.warning("Hash of article %d is already on chain, skipping", article_id,
+                               extra={"article_id": article_id})
+                self.mark_on_chain(article_id, revision_id)
+                continue
+            if self.submit_to_blockchain(article_id, article, revision_id):
+                anchored += 1
+        logger.info("Anchored %d of %d pending articles", anchored, len(pending))
+        return anchored
+    
+    def revisit_articles(self, limit: int = REVISIT_BATCH) -> Dict[str, int]:
+        """
+        Re-fetch stored articles that are due, recording and anchoring edits.
+        
+        Args:
+            limit: Maximum number of articles to re-fetch
             
-            for url in article_links:
-                # Check if article already exists
+        Returns:
+            Number of articles per outcome: unchanged, revised, skipped, failed
+        """
+        outcomes: Counter = Counter()
+        if limit <= 0:
+            return {}
+        
+        with self.db_lock:
+            due = due_articles(self.conn, limit)
+        for article in due:
+            with span("revisit", url=article.source_url, source=article.source_name):
+                outcome = self.revisit_article(article)
+            ARTICLES.labels(article.source_name, outcome).inc()
+            outcomes[outcome] += 1
+        
+        if due:
+            logger.info("Revisited %d articles: %s", len(due),
+                        ", ".join(f"{key}={value}" for key, value in sorted(outcomes.items())))
+        return dict(outcomes)
+    
+    def revisit_article(self, article: DueArticle) -> str:
+        """
+        Re-fetch one stored article and record whether it changed.
+        
+        Args:
+            article: Article due for a re-fetch
+            
+        Returns:
+            "unchanged", "revised", "skipped" or "failed"
+        """
+        url = article.source_url
+        unchanged = article.unchanged_checks + 1
+        if not self.robots_allowed(url) or self.resilience.breaker(url).is_open:
+            # Try again later without counting this as a check
+            with self.db_lock, self.conn.cursor() as cursor:
+                record_check(cursor, article, article.content_hash, article.unchanged_checks,
+                             article.etag, article.last_modified)
+                self.conn.commit()
+            return "skipped"
+        
+        headers = {}
+        if article.etag:
+            headers["If-None-Match"] = article.etag
+        if article.last_modified:
+            headers["If-Modified-Since"] = article.last_modified
+        
+        self.limiter_for(article.source_name, url).wait()
+        
+        revision = None
+        try:
+            with time_stage("revisit", article.source_name):
+                response = self.fetch(url, headers)
+                if response.status_code == 304:
+                    etag, last_modified = article.etag, article.last_modified
+                else:
+                    etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+                    html = decode_html(response.content, response.headers)
+                    revision = parse_article(url, html, article.source_name)
+                    if not revision.content_text.strip():
+                        raise ValueError("no article text extracted")
+        except Exception as e:
+            logger.error("Error revisiting %s: %s", url, e, extra={"url": url, "source": article.source_name})
+            with self.db_lock, self.conn.cursor() as cursor:
+                record_check(cursor, article, article.content_hash, unchanged,
+                             article.etag, article.last_modified)
+                self.conn.commit()
+            return "failed"
+        
+        if revision is None or revision.content_hash_hex == article.content_hash:
+            with self.db_lock, self.conn.cursor() as cursor:
+                record_check(cursor, article, article.content_hash, unchanged, etag, last_modified)
+                self.conn.commit()
+            return "unchanged"
+        
+        # Keep the stored URL and publication date; only the content changed
+        revision = revision._replace(source_url=url,
+                                     publication_date=article.publication_date or revision.publication_date)
+        with self.db_lock:
+            try:
                 with self.conn.cursor() as cursor:
-                    cursor.execute(
-                        "SELECT id FROM articles WHERE source_url = %s",
-                        (url,)
-                    )
-                    if cursor.fetchone():
-                        logger.info(f"Skipping existing article: {url}")
-                        continue
-                
-                # Extract and store article data
-                article_data = self.extract_article_data(url, source["name"])
-                if article_data:
-                    article_id = self.store_article(article_data)
-                    if article_id and self.web3 and self.contract:
-                        self.submit_to_blockchain(article_id, article_data)
-                
-                # Sleep to avoid overwhelming the server
-                time.sleep(2)
+                    content_text = revision.content_text
+                    if self.blobs:
+                        self.blobs.put(cursor, revision.content_hash_hex, content_text)
+                        content_text = None
+                    revision_id = store_revision(cursor, article, revision.title, content_text,
+                                                 revision.content_hash_hex)
+                    record_check(cursor, article, revision.content_hash_hex, 0, etag, last_modified)
+                    self.conn.commit()
+                self.cache.invalidate_hash(revision.content_hash_hex)
+            except Exception as e:
+                self.conn.rollback()
+                logger.error("Error storing revision of %s: %s", url, e, extra={"url": url})
+                return "failed"
+        logger.info("Article %d changed, new content hash %s", article.article_id, revision.content_hash_hex,
+                    extra={"article_id": article.article_id, "url": url})
+        
+        # Only hashes the contract hasn't seen, e.g. not an edit that was reverted
+        if revision_id and self.web3 and self.contract:
+            try:
+                on_chain = self.contract.functions.isArticleHashStored(revision.content_hash_hex).call()
+            except Exception as e:
+                logger.error("Error checking revision hash on chain: %s", e, extra={"article_id": article.article_id})
+                # Left for anchor_pending to check again
+                on_chain = None
+            if on_chain:
+                self.mark_on_chain(article.article_id, revision_id)
+            elif on_chain is not None:
+                self.submit_to_blockchain(article.article_id, revision, revision_id)
+        return "revised"
+    
+    def mark_on_chain(self, article_id: int, revision_id: Optional[int]):
+        """
+        Record that the contract already holds a hash we have no transaction
+        for, so anchor_pending stops checking it.
+        
+        Args:
+            article_id: Article ID in the database
+            revision_id: Revision the hash belongs to, None for the article itself
+        """
+        with self.db_lock:
+            try:
+                with self.conn.cursor() as cursor:
+                    if revision_id is None:
+                        cursor.execute("UPDATE articles SET on_chain_at = CURRENT_TIMESTAMP WHERE id = %s",
+                                       (article_id,))
+                    else:
+                        cursor.execute("UPDATE article_revisions SET on_chain_at = CURRENT_TIMESTAMP WHERE id = %s",
+                                       (revision_id,))
+                    self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                logger.error("Error recording on-chain hash: %s", e, extra={"article_id": article_id})
     
     def close(self):
-        """Close database connection."""
-        if self.conn:
+        """
+        Wait for queued images, then close the archive segment and the
+        database connection unless it was passed in.
+        """
+        if self.media:
+            self.media.close()
+        if self.archive:
+            self.archive.close()
+        if self.conn and self.owns_conn:
             self.conn.close()
             logger.info("Database connection closed")
 
-def run_crawler():
-    """Run the crawler as a scheduled job."""
+def run_crawler(conn=None):
+    """
+    Run the crawler as a scheduled job.
+    
+    Args:
+        conn: Existing connection to use instead of opening a new one
+    """
     logger.info("Starting crawler job")
-    crawler = PalestineNewsCrawler()
+    crawler = PalestineNewsCrawler(conn)
     try:
         crawler.crawl_sources()
+        crawler.revisit_articles()
+        if ENRICHMENT_ENABLED and crawler.conn:
+            try:
+                enrich_articles(crawler.conn)
+            except Exception as e:
+                logger.error(f"Enrichment error: {e}")
     finally:
         crawler.close()
     logger.info("Crawler job completed")
 
 def main():
     """Main function to run the crawler on a schedule."""
+    parser = argparse.ArgumentParser(description="Crawl trusted sources for Palestine news")
+    parser.add_argument("--profile", metavar="DIR", help="profile a single crawl cycle and write results to DIR")
+    parser.add_argument("--profile-mode", choices=["sample", "cprofile"], default="sample",
+                        help="sampling wall/CPU profiler or cProfile, covering worker threads (default: sample)")
+    args = parser.parse_args()
+    
     logger.info("Palestine News Crawler starting up")
+    start_metrics_server()
+    setup_tracing()
+    
+    if args.profile:
+        from profiling import profile_run
+        profile_run(run_crawler, args.profile, args.profile_mode)
+        return
+    
+    run_schedule(run_crawler)
+
+def run_schedule(job):
+    """
+    Run a crawl job now and then every 6 hours, forever.
     
+    Args:
+        job: Callable running one crawl cycle
+    """
     # Run immediately on startup
-    run_crawler()
+    job()
     
     # Schedule to run every 6 hours
-    schedule.every(6).hours.do(run_crawler)
+    schedule.every(6).hours.do(job)
     
     # Keep the script running
     while True:
@@ -355,4 +987,4 @@ def main():
         time.sleep(60)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
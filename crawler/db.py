@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Database Connection
+
+Connection settings shared by the crawler scripts and batch jobs, plus a
+process-wide connection pool for entry points that run several jobs.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database connection parameters
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "palestine_news")
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+
+# Connection pool size
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "4"))
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def _connect_kwargs():
+    """Return the connection parameters from the current settings."""
+    return dict(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD
+    )
+
+def connect():
+    """
+    Open a new PostgreSQL connection.
+
+    Returns:
+        psycopg2 connection
+    """
+    return psycopg2.connect(**_connect_kwargs())
+
+def get_pool() -> ThreadedConnectionPool:
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    Returns:
+        psycopg2 ThreadedConnectionPool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, **_connect_kwargs())
+        return _pool
+
+@contextmanager
+def pooled_connection() -> Iterator:
+    """
+    Borrow a connection from the pool for the duration of a block.
+
+    The connection is checked before use and any open transaction is rolled
+    back before it is returned.
+
+    Yields:
+        psycopg2 connection
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        # Idle connections may have been dropped by the server since last use
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+    except psycopg2.Error:
+        pool.putconn(conn, close=True)
+        conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        broken = bool(conn.closed)
+        if not broken:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        pool.putconn(conn, close=broken)
+
+def close_pool():
+    """Close every pooled connection."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Keyword and Entity Enrichment
+
+Tags stored articles with keywords and named entities in side tables, so
+that filtering by place, organization, person or topic is an index lookup
+instead of a scan of content_text:
+
+    article_keywords  (article_id, keyword, score)       indexed by keyword
+    article_entities  (article_id, kind, name, mentions) indexed by (kind, name)
+
+Keywords are newspaper's frequency keywords of the title and text. Places
+and organizations come from a gazetteer, with aliases folded into one name
+("UN" and "United Nations", "IDF" and "Israeli army"); people are runs of
+capitalized words that follow a title or precede "said", or that recur.
+
+Enrichment is optional and runs after each crawl cycle when ENRICHMENT=1,
+or on demand. Articles are tagged in chunks across a process pool and each
+chunk is written in one transaction:
+
+    python cli.py enrich --workers 4
+"""
+
+import os
+import re
+import logging
+from collections import Counter
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+from blobstore import BlobStore, blob_storage_enabled
+from relevance import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+ENRICHMENT_ENABLED = os.getenv("ENRICHMENT", "0") == "1"
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "0")) or os.cpu_count() or 1
+ENRICHMENT_CHUNK = int(os.getenv("ENRICHMENT_CHUNK", "200"))
+
+# Canonical name -> aliases as they appear in text (matched case-sensitively).
+# No alias contains another one, so "Gaza Strip" is a single mention of "Gaza".
+PLACES = {
+    "Gaza": ["Gaza"],
+    "West Bank": ["West Bank"],
+    "Jerusalem": ["Jerusalem", "al-Quds", "Al-Quds"],
+    "Ramallah": ["Ramallah"], "Hebron": ["Hebron", "al-Khalil", "Al-Khalil"], "Jenin": ["Jenin"],
+    "Nablus": ["Nablus"], "Tulkarm": ["Tulkarm"], "Qalqilya": ["Qalqilya"], "Jericho": ["Jericho"],
+    "Bethlehem": ["Bethlehem"], "Rafah": ["Rafah"], "Khan Younis": ["Khan Younis", "Khan Yunis"],
+    "Deir al-Balah": ["Deir al-Balah", "Deir el-Balah"], "Jabalia": ["Jabalia", "Jabaliya"],
+    "Nuseirat": ["Nuseirat"], "Beit Lahia": ["Beit Lahia"], "Beit Hanoun": ["Beit Hanoun"],
+    "Sheikh Jarrah": ["Sheikh Jarrah"], "Silwan": ["Silwan"], "Masafer Yatta": ["Masafer Yatta"],
+    "Al-Aqsa": ["Al-Aqsa", "al-Aqsa", "Al Aqsa"],
+    "Israel": ["Israel"], "Egypt": ["Egypt"], "Jordan": ["Jordan"], "Lebanon": ["Lebanon"],
+    "Syria": ["Syria"], "Tel Aviv": ["Tel Aviv"], "Cairo": ["Cairo"], "Amman": ["Amman"],
+    "Beirut": ["Beirut"], "Doha": ["Doha"], "Qatar": ["Qatar"],
+    "United States": ["United States", "US", "USA"], "Washington": ["Washington"],
+}
+ORGANIZATIONS = {
+    "United Nations": ["United Nations", "UN"], "UNRWA": ["UNRWA"], "OCHA": ["OCHA"],
+    "UN Security Council": ["Security Council", "UNSC"],
+    "World Health Organization": ["World Health Organization", "WHO"],
+    "International Court of Justice": ["International Court of Justice", "ICJ"],
+    "International Criminal Court": ["International Criminal Court", "ICC"],
+    "Red Cross": ["Red Cross", "ICRC", "Red Crescent"],
+    "Hamas": ["Hamas"], "Fatah": ["Fatah"], "Islamic Jihad": ["Islamic Jihad"], "PLO": ["PLO"],
+    "Palestinian Authority": ["Palestinian Authority"],
+    "Israeli army": ["Israeli army", "Israeli military", "IDF", "Israel Defense Forces"],
+    "European Union": ["European Union", "EU"], "Arab League": ["Arab League"],
+    "Amnesty International": ["Amnesty"],
+    "Human Rights Watch": ["Human Rights Watch", "HRW"], "B'Tselem": ["B'Tselem"], "Al-Haq": ["Al-Haq"],
+}
+
+# Words that introduce a person's name, and capitalized words that never belong to one
+PERSON_TITLES = (
+    "President", "Prime Minister", "Minister", "Dr", "Dr.", "Mr", "Mr.", "Ms", "Ms.", "Mrs", "Mrs.",
+    "spokesperson", "spokesman", "spokeswoman", "Secretary-General", "Secretary", "leader",
+    "Ambassador", "ambassador", "journalist", "correspondent", "General", "Gen.", "Sheikh", "Judge",
+)
+NOT_NAMES = frozenset(
+    "The A An In On At For From By With After Before During This That These Those It He She They We "
+    "But And Or If As While When Where Since Until Also However Meanwhile According "
+    "Monday Tuesday Wednesday Thursday Friday Saturday Sunday January February March April May June "
+    "July August September October November December Israeli Israelis Palestinian Palestinians Arab "
+    "Arabs Muslim Muslims Christian Jewish American European International National Ministry Health "
+    "North South East West Northern Southern Eastern Western Strip City Camp Street".split()
+)
+
+# Capitalized titles as word sequences, longest first, so "Prime Minister" is trimmed whole
+TITLE_PREFIXES = tuple(sorted({tuple(title.split()) for title in PERSON_TITLES if title[0].isupper()},
+                              key=len, reverse=True))
+
+# Runs of two to five capitalized words on one line; leading titles and
+# non-name words are trimmed off
+NAME_RE = re.compile(r"\b[A-Z][a-z]+\.?(?:-[A-Z]?[a-z]+)?(?:[ \t]+(?:al-|bin |ben |de |van )?[A-Z][a-z]+(?:-[A-Z]?[a-z]+)?){1,4}\b")
+TITLE_BEFORE_RE = re.compile(r"(?:" + "|".join(re.escape(title) for title in PERSON_TITLES) + r")\s+$")
+SAID_AFTER_RE = re.compile(r"^,?\s+(?:said|says|told|added|wrote|explained)\b")
+
+def _gazetteer(names: Dict[str, List[str]]) -> Tuple[KeywordMatcher, Dict[str, str]]:
+    """Build a case-sensitive matcher over every alias and the alias -> name map."""
+    canonical = {alias: name for name, aliases in names.items() for alias in aliases}
+    return KeywordMatcher(canonical, case_sensitive=True), canonical
+
+PLACE_MATCHER, PLACE_NAMES = _gazetteer(PLACES)
+ORGANIZATION_MATCHER, ORGANIZATION_NAMES = _gazetteer(ORGANIZATIONS)
+
+# Entities stored per article and kind, most mentioned first
+MAX_ENTITIES = 20
+
+def _gazetteer_entities(text: str, matcher: KeywordMatcher, canonical: Dict[str, str]) -> Counter:
+    """Count gazetteer mentions under their canonical names."""
+    mentions: Counter = Counter()
+    for alias, count in matcher.counts(text).items():
+        mentions[canonical[alias]] += count
+    return mentions
+
+def extract_people(text: str) -> Counter:
+    """
+    Find people's names.
+
+    Args:
+        text: Article text
+
+    Returns:
+        Mentions per full name
+    """
+    candidates: Counter = Counter()
+    confirmed = set()
+    for match in NAME_RE.finditer(text):
+        words = match.group(0).split()
+        titled = False
+        while words:
+            title = next((title for title in TITLE_PREFIXES if tuple(words[:len(title)]) == title), None)
+            if title:
+                titled = True
+                del words[:len(title)]
+            elif words[0] in NOT_NAMES:
+                words.pop(0)
+            else:
+                break
+        if not 2 <= len(words) <= 3 or any(word in NOT_NAMES for word in words):
+            continue
+        name = " ".join(words)
+        if name in PLACE_NAMES or name in ORGANIZATION_NAMES:
+            continue
+        candidates[name] += 1
+        before = text[max(0, match.start() - 25):match.start()]
+        after = text[match.end():match.end() + 12]
+        if titled or TITLE_BEFORE_RE.search(before) or SAID_AFTER_RE.match(after):
+            confirmed.add(name)
+    return Counter({name: count for name, count in candidates.items() if name in confirmed or count >= 2})
+
+def extract_tags(title: str, text: str) -> Tuple[Dict[str, float], List[Tuple[str, str, int]]]:
+    """
+    Extract keywords and entities from one article.
+
+    Args:
+        title: Article title
+        text: Article text
+
+    Returns:
+        (keywords with their scores, [(kind, name, mentions)])
+    """
+    from newspaper import nlp
+
+    # The same keyword selection as newspaper's Article.nlp()
+    keywords = nlp.keywords(text)
+    for keyword, score in nlp.keywords(title).items():
+        keywords.setdefault(keyword, score)
+
+    entities = []
+    full_text = f"{title}\n{text}"
+    for kind, mentions in (
+        ("place", _gazetteer_entities(full_text, PLACE_MATCHER, PLACE_NAMES)),
+        ("organization", _gazetteer_entities(full_text, ORGANIZATION_MATCHER, ORGANIZATION_NAMES)),
+        ("person", extract_people(full_text)),
+    ):
+        entities.extend((kind, name, count) for name, count in mentions.most_common(MAX_ENTITIES))
+    return keywords, entities
+
+def _init_worker():
+    """Load newspaper's keyword stop words once per worker process."""
+    from logconfig import configure_worker_logging
+    from newspaper import nlp
+
+    configure_worker_logging()
+    for language in ("en", "ar"):
+        nlp.load_stopwords(language)
+
+def _enrich(task: Tuple[int, str, Optional[str]]) -> Tuple[int, Dict[str, float], List[Tuple[str, str, int]]]:
+    """
+    Tag one article in a worker process.
+
+    Args:
+        task: (article_id, title, content_text)
+
+    Returns:
+        (article_id, keywords, entities), empty if the article can't be tagged
+    """
+    article_id, title, text = task
+    if not text:
+        return article_id, {}, []
+    try:
+        keywords, entities = extract_tags(title or "", text)
+        return article_id, keywords, entities
+    except Exception as e:
+        logger.error(f"Error enriching article {article_id}: {e}")
+        return article_id, {}, []
+
+def pending_articles(conn, blobs, limit: int) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    Fetch the newest articles that haven't been tagged yet.
+
+    Args:
+        conn: psycopg2 connection
+        blobs: BlobStore for bodies kept in article_blobs, or None
+        limit: Maximum number of articles
+
+    Returns:
+        (article_id, title, content_text) tuples
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        SELECT a.id, a.title, a.content_text, a.content_hash
+        FROM articles a
+        LEFT JOIN article_enrichment e ON e.article_id = a.id
+        WHERE e.article_id IS NULL
+        ORDER BY a.id DESC
+        LIMIT %s
+        """, (limit,))
+        rows = cursor.fetchall()
+    conn.commit()
+    return [
+        (article_id, title, text if text is not None or not blobs else blobs.get(content_hash))
+        for article_id, title, text, content_hash in rows
+    ]
+
+def store_tags(cursor, results: List[Tuple[int, Dict[str, float], List[Tuple[str, str, int]]]]):
+    """
+    Write the tags of a chunk of articles and mark them as enriched.
+
+    Args:
+        cursor: psycopg2 cursor
+        results: (article_id, keywords, entities) per article
+    """
+    ids = [article_id for article_id, _, _ in results]
+    keywords = [(article_id, keyword, score) for article_id, tags, _ in results for keyword, score in tags.items()]
+    entities = [(article_id, kind, name, mentions) for article_id, _, found in results
+                for kind, name, mentions in found]
+
+    # Re-tagging an article replaces its previous tags
+    cursor.execute("DELETE FROM article_keywords WHERE article_id = ANY(%s)", (ids,))
+    cursor.execute("DELETE FROM article_entities WHERE article_id = ANY(%s)", (ids,))
+    if keywords:
+        execute_values(cursor, "INSERT INTO article_keywords (article_id, keyword, score) VALUES %s",
+                       keywords, page_size=1000)
+    if entities:
+        execute_values(cursor, "INSERT INTO article_entities (article_id, kind, name, mentions) VALUES %s",
+                       entities, page_size=1000)
+    execute_values(cursor, """
+    INSERT INTO article_enrichment (article_id) VALUES %s
+    ON CONFLICT (article_id) DO UPDATE SET enriched_at = CURRENT_TIMESTAMP
+    """, [(article_id,) for article_id in ids], page_size=1000)
+
+def enrich_articles(conn, limit: Optional[int] = None, workers: int = ENRICHMENT_WORKERS,
+                    chunk_size: int = ENRICHMENT_CHUNK) -> int:
+    """
+    Tag untagged articles, newest first.
+
+    Args:
+        conn: psycopg2 connection
+        limit: Maximum number of articles, all of them if None
+        workers: Number of worker processes
+        chunk_size: Articles fetched, tagged and written per transaction
+
+    Returns:
+        Number of articles tagged
+    """
+    blobs = BlobStore(conn) if blob_storage_enabled() else None
+
+    tagged = 0
+    with Pool(workers, initializer=_init_worker) as pool:
+        while limit is None or tagged < limit:
+            size = chunk_size if limit is None else min(chunk_size, limit - tagged)
+            tasks = pending_articles(conn, blobs, size)
+            if not tasks:
+                break
+            results = list(pool.imap(_enrich, tasks, chunksize=8))
+            try:
+                with conn.cursor() as cursor:
+                    store_tags(cursor, results)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            tagged += len(results)
+            logger.info(f"Tagged {tagged} articles")
+    return tagged
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Article Extraction
+
+Turns raw article HTML into article records. The crawler runs this on freshly
+downloaded pages; offline jobs run it on HTML read back from the archive, so
+both paths produce identical text and content hashes.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Tuple, Union
+from urllib.parse import urljoin
+
+from records import ArticleRecord, content_digest
+from urlnorm import canonical_source_url
+
+# Encoding requests assumes for text/* responses without a charset; like
+# newspaper, we don't trust it and look for a <meta> declaration instead.
+FALLBACK_ENCODING = "ISO-8859-1"
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+def compute_content_hash(text: str) -> str:
+    """
+    Generate the SHA-256 hash of article content.
+
+    Args:
+        text: Extracted article text
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    return content_digest(text).hex()
+
+def decode_html(body: bytes, headers: Union[Dict[str, str], Iterable[Tuple[str, str]]]) -> str:
+    """
+    Decode a response body to text.
+
+    Args:
+        body: Raw response body
+        headers: Response headers as a mapping or (name, value) pairs
+
+    Returns:
+        Decoded HTML
+    """
+    # Imported here so hashing alone doesn't load requests
+    from requests.utils import get_encoding_from_headers
+
+    if not isinstance(headers, dict):
+        headers = dict(headers)
+    headers = {name.lower(): value for name, value in headers.items()}
+
+    encoding = get_encoding_from_headers(headers)
+    if not encoding or encoding.upper() == FALLBACK_ENCODING:
+        match = META_CHARSET_RE.search(body[:4096])
+        encoding = match.group(1).decode("ascii") if match else encoding or "utf-8"
+
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def parse_article(url: str, html: str, source_name: str) -> ArticleRecord:
+    """
+    Extract article data from downloaded HTML using newspaper3k.
+
+    The record's source URL is the page's <link rel="canonical"> (or
+    og:url) when it points to the same site, the URL fetched otherwise.
+    Its images are the og:image and the images inside the article body;
+    none of them are downloaded here.
+
+    Args:
+        url: Article URL
+        html: Article HTML
+        source_name: Name of the news source
+
+    Returns:
+        Article record
+    """
+    # Imported here so hashing and decoding don't load newspaper
+    from newspaper import Article
+
+    # newspaper would otherwise download images to pick a top image,
+    # outside the crawler's rate limits
+    article = Article(url, fetch_images=False)
+    article.download(input_html=html)
+    article.parse()
+
+    # Extract publication date or use current time if not available
+    pub_date = article.publish_date or datetime.now()
+
+    source_url = canonical_source_url(url, article.canonical_link)
+
+    images = [article.meta_img]
+    if article.clean_top_node is not None:
+        images.extend(urljoin(url, img.get("src")) for img in article.clean_top_node.iter("img")
+                      if img.get("src"))
+    image_urls = tuple(dict.fromkeys(
+        image for image in images if image and image.startswith(("http://", "https://"))
+    ))
+
+    return ArticleRecord.from_text(article.title, source_url, source_name, pub_date, article.text, image_urls)
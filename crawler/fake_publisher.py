@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Fake Publisher
+
+Local HTTP server that imitates news sites for benchmarking the crawler.
+Each source gets an index page whose markup matches its article selector and
+a set of synthetic article pages, with configurable latency, size and error
+injection. Output is deterministic for a given seed.
+
+    python fake_publisher.py --port 8765 --articles 50 --latency-ms 80 --error-rate 0.02
+"""
+
+import re
+import time
+import random
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from sources import Source, load_sources
+
+logger = logging.getLogger(__name__)
+
+WORDS = (
+    "Gaza West Bank Jerusalem Palestinian families olive harvest water shortage hospital "
+    "ceasefire aid convoy refugees camp school children journalists checkpoint settlement "
+    "farmers village ministry report UN agency humanitarian crisis residents reconstruction "
+    "electricity fuel border crossing medical supplies displaced community"
+).split()
+
+# Stopwords make the text look like prose to newspaper's content extractor
+FILLER = "the of and in to a was said has with for on that by from their after".split()
+
+SELECTOR_TOKEN_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$")
+
+def slugify(name: str) -> str:
+    """Turn a source name into a URL path segment."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+def markup_for_selector(selector: str, href: str, text: str) -> str:
+    """
+    Build nested markup that a simple descendant selector matches.
+
+    Args:
+        selector: Selector such as "article.teaser h3 a"
+        href: Link target of the innermost anchor
+        text: Link text
+
+    Returns:
+        HTML fragment
+    """
+    opening, closing = [], []
+    tokens = selector.split()
+    for position, token in enumerate(tokens):
+        match = SELECTOR_TOKEN_RE.match(token)
+        if not match:
+            raise ValueError(f"Unsupported selector token: {token}")
+        tag = match.group(1) or "div"
+        classes = match.group(2).replace(".", " ").strip()
+        attributes = f' class="{classes}"' if classes else ""
+        if position == len(tokens) - 1:
+            attributes += f' href="{href}"'
+        opening.append(f"<{tag}{attributes}>")
+        closing.insert(0, f"</{tag}>")
+    return "".join(opening) + text + "".join(closing)
+
+class FakePublisher:
+    """Generates index and article pages for a set of fake sources."""
+
+    def __init__(self, sources: List[Source], articles: int = 20, size_kb: int = 8,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, seed: int = 1):
+        """
+        Initialize the publisher.
+
+        Args:
+            sources: Source templates providing name and selectors
+            articles: Number of articles on each index page
+            size_kb: Approximate article body size
+            latency_ms: Delay added to every response
+            jitter_ms: Maximum random extra delay
+            error_rate: Fraction of article requests answered with HTTP 503
+            seed: Seed for deterministic content and errors
+        """
+        self.sources = {slugify(source.name): source for source in sources}
+        self.articles = articles
+        self.size_kb = size_kb
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def source_configs(self, base_url: str, concurrency: int = 1) -> List[Source]:
+        """
+        Return crawler sources pointing at this publisher.
+
+        Args:
+            base_url: Root URL the server listens on
+            concurrency: Article downloads in flight per source
+
+        Returns:
+            Enabled sources without a rate limit
+        """
+        return [
+            source._replace(url=f"{base_url}/{slug}/", base_url=base_url, feeds=(),
+                            concurrency=concurrency, rate=0, enabled=True)
+            for slug, source in self.sources.items()
+        ]
+
+    def delay(self):
+        """Sleep for the configured latency plus jitter."""
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms)
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def should_fail(self) -> bool:
+        """Decide whether to inject an error for this request."""
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def index_page(self, slug: str) -> str:
+        """Render the index page of a source."""
+        source = self.sources[slug]
+        items = "\n".join(
+            markup_for_selector(source.selectors[0], f"/{slug}/article/{n}", f"Article {n}")
+            for n in range(self.articles)
+        )
+        return f"<html><head><title>{source.name}</title></head><body>\n{items}\n</body></html>"
+
+    def article_page(self, slug: str, number: int) -> str:
+        """Render a synthetic article; the same URL always yields the same page."""
+        rng = random.Random(f"{self.seed}-{slug}-{number}")
+        title = " ".join(rng.choice(WORDS) for _ in range(8)).capitalize()
+        published = datetime(2025, 1, 1) + timedelta(hours=rng.randrange(24 * 365))
+
+        paragraphs = []
+        size = 0
+        while size < self.size_kb * 1024:
+            sentence_count = rng.randint(3, 6)
+            paragraph = " ".join(
+                " ".join(rng.choice(WORDS if i % 2 else FILLER) for i in range(rng.randint(8, 20))).capitalize() + "."
+                for _ in range(sentence_count)
+            )
+            paragraphs.append(f"<p>{paragraph}</p>")
+            size += len(paragraph)
+
+        return (
+            "<html><head>"
+            f"<title>{title}</title>"
+            f'<meta property="article:published_time" content="{published.isoformat()}">'
+            "</head><body><article>"
+            f"<h1>{title}</h1>{''.join(paragraphs)}"
+            "</article></body></html>"
+        )
+
+    def handler(self):
+        """Build a request handler class bound to this publisher."""
+        publisher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                publisher.delay()
+                parts = self.path.strip("/").split("/")
+                slug = parts[0] if parts else ""
+                if slug not in publisher.sources:
+                    return self.respond(404, "not found")
+                if len(parts) == 1:
+                    return self.respond(200, publisher.index_page(slug))
+                if len(parts) == 3 and parts[1] == "article" and parts[2].isdigit():
+                    if publisher.should_fail():
+                        return self.respond(503, "injected error")
+                    return self.respond(200, publisher.article_page(slug, int(parts[2])))
+                return self.respond(404, "not found")
+
+            def respond(self, status: int, body: str):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve(self, host: str, port: int) -> ThreadingHTTPServer:
+        """
+        Start serving in a background thread.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+
+        Returns:
+            The running server
+        """
+        server = ThreadingHTTPServer((host, port), self.handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+def main():
+    """Main function to run the fake publisher until interrupted."""
+    logging.basicConfig(level=logging.WARNING)
+    templates = load_sources()
+
+    parser = argparse.ArgumentParser(description="Serve synthetic news sites for crawler benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sources", type=int, default=len(templates), help="number of fake sources")
+    parser.add_argument("--articles", type=int, default=20, help="articles per source")
+    parser.add_argument("--size-kb", type=int, default=8, help="approximate article size")
+    parser.add_argument("--latency-ms", type=float, default=0, help="latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="maximum random extra latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of article requests that fail")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    publisher = FakePublisher(
+        templates[:args.sources], args.articles, args.size_kb,
+        args.latency_ms, args.jitter_ms, args.error_rate, args.seed
+    )
+    server = publisher.serve(args.host, args.port)
+    print(f"Serving {len(publisher.sources)} fake sources on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Logging Setup
+
+Non-blocking logging for the crawler scripts. Callers only enqueue records;
+a background QueueListener formats them and writes them to the console and
+to a rotating log file of JSON lines. Repetitive messages can be sampled so
+that, for example, only one in LOG_SAMPLE_RATE "Skipping existing article"
+lines is kept:
+
+    logger.info("Skipping existing article: %s", url, extra={"sample": "skip_existing"})
+
+Any other extra fields are written as JSON keys.
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Dict
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size")
+LOG_MAX_MB = int(os.getenv("LOG_MAX_MB", "50"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "7"))
+LOG_SAMPLE_RATE = int(os.getenv("LOG_SAMPLE_RATE", "50"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through extra=
+RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keeps one in every `rate` records that carry the same sample key."""
+
+    def __init__(self, rate: int):
+        super().__init__()
+        self.rate = max(1, rate)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None or self.rate == 1:
+            return True
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+def configure_logging(log_file: str):
+    """
+    Route all logging through a background listener.
+
+    Like logging.basicConfig, this does nothing if the root logger already
+    has handlers, so scripts imported by another entry point keep its setup.
+
+    Args:
+        log_file: Path of the rotating JSON log file
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    if LOG_ROTATION == "time":
+        file_handler = TimedRotatingFileHandler(log_file, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUPS)
+    else:
+        file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_MB * 1024 * 1024, backupCount=LOG_BACKUPS)
+    file_handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+def configure_worker_logging():
+    """
+    Reset logging in a forked worker process.
+
+    A forked child inherits the parent's queue handler but not its listener
+    thread, so records would pile up unread; workers log to stderr instead.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.basicConfig(level=LOG_LEVEL, format=TEXT_FORMAT)
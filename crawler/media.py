@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Article Media
+
+Collects the images of stored articles (the og:image and the images in the
+article body, up to MEDIA_PER_ARTICLE each) when MEDIA=1. Only a JPEG
+thumbnail of at most THUMBNAIL_SIZE pixels and the image's metadata are
+stored; originals are discarded.
+
+Downloads use the crawler's session and retries and obey robots.txt, but
+run on their own MEDIA_WORKERS threads behind their own circuit breakers
+(media:<host>), so failing images never suspend a host's articles. Images
+on a source's own host share that source's rate limiter with its article
+requests; other hosts, such as image CDNs, get MEDIA_RATE requests per
+second. Article workers only enqueue, and when MEDIA_QUEUE articles are
+already waiting an article's images are skipped, so media never holds up
+article fetching. Each download stops at MEDIA_MAX_BYTES.
+
+The same picture is stored once across articles and sources:
+
+- by URL: an image URL already linked to an article isn't downloaded again
+- by content: a 64-bit difference hash (dHash) survives re-encoding,
+  resizing and light edits, so a copy republished by another outlet lands
+  within MEDIA_DEDUP_DISTANCE bits of the stored one and is linked to it
+"""
+
+import io
+import os
+import hashlib
+import logging
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+
+from metrics import MEDIA, time_stage
+from ratelimit import RateLimiter
+from resilience import CircuitOpenError, Resilience
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+MEDIA_ENABLED = os.getenv("MEDIA", "0") == "1"
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))
+MEDIA_QUEUE = int(os.getenv("MEDIA_QUEUE", "100"))
+MEDIA_PER_ARTICLE = int(os.getenv("MEDIA_PER_ARTICLE", "4"))
+MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(5 * 1024 * 1024)))
+# Image requests per second to a host that isn't a source's, e.g. a CDN
+MEDIA_RATE = float(os.getenv("MEDIA_RATE", "1"))
+MEDIA_DEDUP_DISTANCE = int(os.getenv("MEDIA_DEDUP_DISTANCE", "4"))
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "320"))
+
+# Icons, spacers and tracking pixels are smaller than this in either dimension
+MEDIA_MIN_PIXELS = 100
+# Larger images are refused before decoding, whatever their file size
+MEDIA_MAX_IMAGE_PIXELS = 50_000_000
+
+HASH_BITS = 64
+
+class MediaSkipped(Exception):
+    """Raised for an image that is deliberately not stored, e.g. too large or too small."""
+
+class ImageInfo(NamedTuple):
+    """What is kept of a downloaded image."""
+
+    sha256: str
+    dhash: int
+    mime_type: str
+    width: int
+    height: int
+    size: int
+    thumbnail: bytes
+
+def dhash(image) -> int:
+    """
+    Compute the difference hash of an image.
+
+    Each bit tells whether a pixel of a 9x8 grayscale reduction is brighter
+    than its right-hand neighbour.
+
+    Args:
+        image: PIL image
+
+    Returns:
+        Unsigned 64-bit hash
+    """
+    from PIL import Image
+
+    pixels = list(image.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            left = pixels[row * 9 + column]
+            value = value << 1 | (left > pixels[row * 9 + column + 1])
+    return value
+
+def to_bigint(value: int) -> int:
+    """Map an unsigned 64-bit hash onto PostgreSQL's signed BIGINT."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+def from_bigint(value: int) -> int:
+    """Map a BIGINT column value back to the unsigned hash."""
+    return value & ((1 << HASH_BITS) - 1)
+
+class PerceptualIndex:
+    """
+    Finds stored images whose hash is within a few bits of a new one.
+
+    Hashes are split into distance + 1 bands; by the pigeonhole principle
+    two hashes that differ in at most distance bits agree exactly on at
+    least one band, so only images sharing a band are compared.
+    """
+
+    def __init__(self, distance: int = MEDIA_DEDUP_DISTANCE):
+        """
+        Initialize an empty index.
+
+        Args:
+            distance: Largest number of differing bits that counts as the same picture
+        """
+        self.distance = distance
+        bands = distance + 1
+        width, extra = divmod(HASH_BITS, bands)
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for band in range(bands):
+            bits = width + (band < extra)
+            self._bands.append((shift, (1 << bits) - 1))
+            shift += bits
+        self._tables: List[Dict[int, List[Tuple[int, int]]]] = [{} for _ in self._bands]
+        self._max_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._tables[0].values())
+
+    def refresh(self, conn) -> int:
+        """
+        Load the hashes of images stored since the last refresh.
+
+        Args:
+            conn: psycopg2 connection
+
+        Returns:
+            Number of hashes loaded
+        """
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id, dhash FROM media WHERE id > %s", (self._max_id,))
+            rows = cursor.fetchall()
+        conn.rollback()
+        for media_id, value in rows:
+            self.add(from_bigint(value), media_id)
+        return len(rows)
+
+    def add(self, value: int, media_id: int):
+        """
+        Add a stored image.
+
+        Args:
+            value: Unsigned dHash
+            media_id: ID of the image in the media table
+        """
+        with self._lock:
+            for table, (shift, mask) in zip(self._tables, self._bands):
+                table.setdefault(value >> shift & mask, []).append((value, media_id))
+            self._max_id = max(self._max_id, media_id)
+
+    def find(self, value: int) -> Optional[int]:
+        """
+        Find a stored image showing the same picture.
+
+        Args:
+            value: Unsigned dHash of the new image
+
+        Returns:
+            ID of the closest stored image, or None if none is within distance
+        """
+        best = None
+        with self._lock:
+            for table, (shift, mask) in zip(self._tables, self._bands):
+                for stored, media_id in table.get(value >> shift & mask, ()):
+                    bits = (stored ^ value).bit_count()
+                    if bits <= self.distance and (best is None or bits < best[0]):
+                        best = (bits, media_id)
+        return best[1] if best else None
+
+# Index shared by every crawl cycle in the process
+MEDIA_INDEX = PerceptualIndex()
+
+def read_capped(response: requests.Response, max_bytes: int = MEDIA_MAX_BYTES) -> bytes:
+    """
+    Read a streamed response body, refusing anything over the cap.
+
+    Args:
+        response: Response opened with stream=True
+        max_bytes: Largest body accepted
+
+    Returns:
+        Response body
+
+    Raises:
+        MediaSkipped: If the body is, or claims to be, larger than max_bytes
+    """
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise MediaSkipped(f"{length} bytes")
+    body = bytearray()
+    for chunk in response.iter_content(64 * 1024):
+        body += chunk
+        if len(body) > max_bytes:
+            raise MediaSkipped(f"over {max_bytes} bytes")
+    return bytes(body)
+
+def process_image(body: bytes) -> ImageInfo:
+    """
+    Decode an image, hash it and make its thumbnail.
+
+    Args:
+        body: Downloaded image file
+
+    Returns:
+        Image metadata and thumbnail
+
+    Raises:
+        MediaSkipped: If the image is too small or too large to keep
+        PIL.UnidentifiedImageError: If the file isn't an image Pillow can read
+    """
+    # Imported here so the crawler doesn't load Pillow unless media is enabled
+    from PIL import Image
+
+    with Image.open(io.BytesIO(body)) as image:
+        width, height = image.size
+        mime_type = Image.MIME.get(image.format, "application/octet-stream")
+        if width < MEDIA_MIN_PIXELS or height < MEDIA_MIN_PIXELS:
+            raise MediaSkipped(f"{width}x{height} pixels")
+        if width * height > MEDIA_MAX_IMAGE_PIXELS:
+            raise MediaSkipped(f"{width}x{height} pixels")
+
+        # JPEGs decode straight to a reduced size, several times faster
+        image.draft("RGB", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        picture = image.convert("RGB")
+
+    value = dhash(picture)
+    picture.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+    thumbnail = io.BytesIO()
+    picture.save(thumbnail, "JPEG", quality=80, optimize=True)
+    return ImageInfo(hashlib.sha256(body).hexdigest(), value, mime_type, width, height, len(body),
+                     thumbnail.getvalue())
+
+def known_media(cursor, url: str) -> Optional[int]:
+    """
+    Look up an image URL that is already linked to an article.
+
+    Args:
+        cursor: psycopg2 cursor
+        url: Image URL
+
+    Returns:
+        Media ID, or None if the URL is new
+    """
+    cursor.execute("SELECT media_id FROM article_media WHERE image_url = %s LIMIT 1", (url,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def store_media(cursor, url: str, info: ImageInfo) -> int:
+    """
+    Store an image's metadata and thumbnail.
+
+    Args:
+        cursor: psycopg2 cursor
+        url: URL the image was first downloaded from
+        info: Processed image
+
+    Returns:
+        Media ID, that of the stored copy if the file is already stored
+    """
+    cursor.execute("""
+    INSERT INTO media (sha256, dhash, source_url, mime_type, width, height, size, thumbnail)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (sha256) DO UPDATE SET sha256 = EXCLUDED.sha256
+    RETURNING id
+    """, (info.sha256, to_bigint(info.dhash), url, info.mime_type, info.width, info.height, info.size,
+          info.thumbnail))
+    return cursor.fetchone()[0]
+
+def link_media(cursor, article_id: int, position: int, media_id: int, url: str):
+    """
+    Link an image to an article.
+
+    Args:
+        cursor: psycopg2 cursor
+        article_id: Article ID
+        position: Index of the image in the article, 0 for the lead image
+        media_id: Media ID
+        url: URL of the image in this article
+    """
+    cursor.execute("""
+    INSERT INTO article_media (article_id, position, media_id, image_url)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (article_id, position) DO NOTHING
+    """, (article_id, position, media_id, url))
+
+class MediaHarvester:
+    """Downloads and stores article images on a bounded pool of threads."""
+
+    def __init__(self, conn, db_lock: threading.RLock,
+                 get: Callable[..., requests.Response], allowed: Callable[[str], bool],
+                 host_limiter: Callable[[str], Optional[RateLimiter]],
+                 workers: int = MEDIA_WORKERS, queue_size: int = MEDIA_QUEUE):
+        """
+        Start the worker threads.
+
+        Args:
+            conn: psycopg2 connection shared with the crawler
+            db_lock: Lock guarding conn
+            get: The crawler's GET with retries, called as
+                get(url, stream=True, resilience=...) with media's own breakers
+            allowed: Tells whether robots.txt allows a URL
+            host_limiter: Returns the crawler's limiter for a URL's host if
+                it is a source's host, else None
+            workers: Concurrent image downloads
+            queue_size: Articles that may wait for a worker before new ones are skipped
+
+        Raises:
+            ImportError: If Pillow isn't installed
+        """
+        # Fail here, not in every worker, if Pillow is missing
+        if importlib.util.find_spec("PIL") is None:
+            raise ImportError("MEDIA=1 requires Pillow (pip install Pillow)")
+
+        self.conn = conn
+        self.db_lock = db_lock
+        self.get = get
+        self.allowed = allowed
+        self.host_limiter = host_limiter
+        # Keyed apart from the article breakers, so failing images can't
+        # suspend article fetching from the same host
+        self.resilience = Resilience(prefix="media:")
+        self.index = MEDIA_INDEX
+        with db_lock:
+            loaded = self.index.refresh(conn)
+        logger.info(f"Loaded {loaded} image hashes ({len(self.index)} total)")
+
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="media")
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.limiters_lock = threading.Lock()
+
+    def submit(self, article_id: int, source_name: str, image_urls: Sequence[str]) -> bool:
+        """
+        Queue an article's images without waiting for them.
+
+        Args:
+            article_id: Article ID
+            source_name: Name of the news source
+            image_urls: Image URLs, lead image first
+
+        Returns:
+            True if queued, False if the queue was full and the images were skipped
+        """
+        image_urls = list(image_urls[:MEDIA_PER_ARTICLE])
+        if not image_urls:
+            return True
+        if not self.slots.acquire(blocking=False):
+            MEDIA.labels(source_name, "dropped").inc(len(image_urls))
+            return False
+
+        def harvest():
+            try:
+                for position, url in enumerate(image_urls):
+                    MEDIA.labels(source_name, self.harvest_image(article_id, position, url, source_name)).inc()
+            finally:
+                self.slots.release()
+
+        self.pool.submit(harvest)
+        return True
+
+    def limiter(self, url: str) -> RateLimiter:
+        """Return the limiter of a source's host, or a media limiter for any other host."""
+        limiter = self.host_limiter(url)
+        if limiter is not None:
+            return limiter
+        host = urlsplit(url).netloc
+        with self.limiters_lock:
+            if host not in self.limiters:
+                self.limiters[host] = RateLimiter(MEDIA_RATE)
+            return self.limiters[host]
+
+    def harvest_image(self, article_id: int, position: int, url: str, source_name: str) -> str:
+        """
+        Store one image of an article, or link it to a stored copy.
+
+        Args:
+            article_id: Article ID
+            position: Index of the image in the article
+            url: Image URL
+            source_name: Name of the news source
+
+        Returns:
+            "stored", "known", "duplicate", "skipped", "disallowed" or "failed"
+        """
+        try:
+            with self.db_lock, self.conn.cursor() as cursor:
+                media_id = known_media(cursor, url)
+                if media_id is not None:
+                    link_media(cursor, article_id, position, media_id, url)
+                self.conn.commit()
+            if media_id is not None:
+                return "known"
+            if not self.allowed(url):
+                return "disallowed"
+
+            self.limiter(url).wait()
+            # Caught inside the stage so deliberate skips aren't counted as errors
+            skipped = None
+            with time_stage("media", source_name):
+                try:
+                    response = self.get(url, stream=True, resilience=self.resilience)
+                    try:
+                        content_type = response.headers.get("Content-Type", "")
+                        if not content_type.startswith("image/") or content_type.startswith("image/svg"):
+                            raise MediaSkipped(f"content type {content_type!r}")
+                        body = read_capped(response)
+                    finally:
+                        response.close()
+                    info = process_image(body)
+                except MediaSkipped as e:
+                    skipped = e
+            if skipped:
+                logger.info("Skipping image %s: %s", url, skipped, extra={"url": url, "sample": "media_skipped"})
+                return "skipped"
+
+            # Find and store under one lock, so two workers with copies of
+            # the same picture can't both store it
+            outcome = "duplicate"
+            with self.db_lock, self.conn.cursor() as cursor:
+                media_id = self.index.find(info.dhash)
+                if media_id is None:
+                    outcome = "stored"
+                    media_id = store_media(cursor, url, info)
+                link_media(cursor, article_id, position, media_id, url)
+                self.conn.commit()
+                if outcome == "stored":
+                    self.index.add(info.dhash, media_id)
+            return outcome
+        except (requests.RequestException, CircuitOpenError) as e:
+            logger.info("Couldn't download image %s: %s", url, e, extra={"url": url, "sample": "media_failed"})
+            return "failed"
+        except OSError as e:
+            # Truncated files and formats Pillow can't read
+            logger.info("Couldn't decode image %s: %s", url, e, extra={"url": url, "sample": "media_failed"})
+            return "failed"
+        except Exception as e:
+            with self.db_lock:
+                self.conn.rollback()
+            logger.error("Error storing image %s: %s", url, e, extra={"url": url, "article_id": article_id})
+            return "failed"
+
+    def close(self):
+        """Wait for queued images to be stored and stop the workers."""
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Crawler Metrics
+
+Prometheus metrics for each stage of the crawl pipeline, labeled by source.
+Set METRICS_PORT to expose them on a local HTTP endpoint:
+
+    METRICS_PORT=9108 python crawler.py
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from dotenv import load_dotenv
+from prometheus_client import Counter, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+METRICS_ADDR = os.getenv("METRICS_ADDR", "127.0.0.1")
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+
+# Network stages dominate, so buckets stretch well past the 30s request timeout
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+STAGE_SECONDS = Histogram(
+    "crawler_stage_duration_seconds",
+    "Time spent in a crawl pipeline stage",
+    ["stage", "source"],
+    buckets=STAGE_BUCKETS
+)
+STAGE_ERRORS = Counter(
+    "crawler_stage_errors_total",
+    "Crawl pipeline stage failures",
+    ["stage", "source"]
+)
+ARTICLES = Counter(
+    "crawler_articles_total",
+    "Articles seen by the crawler, by outcome",
+    ["source", "outcome"]
+)
+LINKS_FOUND = Counter(
+    "crawler_links_found_total",
+    "Article links found on source index pages",
+    ["source"]
+)
+URL_FILTER_CHECKS = Counter(
+    "crawler_url_filter_checks_total",
+    "Stored-article checks by filter result: miss (no query), stored, false_positive",
+    ["result"]
+)
+CACHE_LOOKUPS = Counter(
+    "crawler_cache_lookups_total",
+    "Article cache lookups by key kind (url, hash) and result: hit, shared_hit, miss",
+    ["kind", "result"]
+)
+HTTP_RETRIES = Counter(
+    "crawler_http_retries_total",
+    "Requests retried after a transient failure",
+    ["host"]
+)
+CIRCUIT_OPENS = Counter(
+    "crawler_circuit_opens_total",
+    "Times a host's circuit breaker opened",
+    ["host"]
+)
+MEDIA = Counter(
+    "crawler_media_total",
+    "Article images by outcome: stored, known (URL), duplicate (picture), skipped, dropped, failed",
+    ["source", "outcome"]
+)
+ANCHOR_LAG_SECONDS = Histogram(
+    "crawler_anchor_lag_seconds",
+    "Time from storing an article to its blockchain receipt",
+    ["source"],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 21600, 86400)
+)
+
+# Extra callbacks (stage, source, seconds, failed) for every timed stage,
+# used by the profiler to collect per-stage totals for a run
+STAGE_OBSERVERS: List[Callable[[str, str, float, bool], None]] = []
+
+@contextmanager
+def time_stage(stage: str, source: str) -> Iterator[None]:
+    """
+    Time a pipeline stage and count it as failed if it raises.
+
+    Args:
+        stage: Stage name
+        source: Name of the news source
+    """
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        STAGE_ERRORS.labels(stage, source).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage, source).observe(elapsed)
+        for observer in STAGE_OBSERVERS:
+            observer(stage, source, elapsed, failed)
+
+def start_metrics_server():
+    """Expose metrics over HTTP if METRICS_PORT is set."""
+    if not METRICS_PORT:
+        return
+    start_http_server(int(METRICS_PORT), addr=METRICS_ADDR)
+    logger.info(f"Serving metrics on http://{METRICS_ADDR}:{METRICS_PORT}/metrics")
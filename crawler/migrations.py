@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Schema Migrations
+
+Versioned schema shared by the crawler, the article scraper and the batch
+jobs. Each migration runs once, in order, inside its own transaction, and is
+recorded in schema_migrations. When the database is already current, startup
+costs a single SELECT and no DDL is executed.
+
+To change the schema, append a new migration to MIGRATIONS; never edit one
+that has already shipped.
+
+    python migrations.py          # apply pending migrations
+    python migrations.py status   # show the current version
+"""
+
+import sys
+import logging
+from typing import List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_lock so concurrent startups don't race
+MIGRATION_LOCK_KEY = 7_301_948
+
+class Migration(NamedTuple):
+    """A single schema change."""
+    version: int
+    description: str
+    sql: str
+
+# Kept separate so partitions.py can rebuild them on a converted table
+ARTICLE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_articles_content_hash ON articles (content_hash);
+CREATE INDEX IF NOT EXISTS idx_articles_source_name ON articles (source_name, publication_date DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_publication_date ON articles (publication_date DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_blockchain_tx_hash ON articles (blockchain_tx_hash)
+    WHERE blockchain_tx_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_articles_unanchored ON articles (id)
+    WHERE blockchain_tx_hash IS NULL
+"""
+
+# Revisit scheduling filters recently created articles; added after
+# ARTICLE_INDEXES shipped, and rebuilt by partitions.py alongside it
+CREATED_AT_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles (created_at)
+"""
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create articles table", """
+    CREATE TABLE IF NOT EXISTS articles (
+        id SERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        source_url TEXT NOT NULL UNIQUE,
+        source_name TEXT NOT NULL,
+        publication_date TIMESTAMP,
+        content_text TEXT,
+        content_hash TEXT NOT NULL,
+        blockchain_tx_hash TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """),
+    Migration(2, "Index hot query paths", ARTICLE_INDEXES),
+    Migration(3, "Create article blob tables", """
+    CREATE TABLE IF NOT EXISTS blob_dictionaries (
+        id SERIAL PRIMARY KEY,
+        dictionary BYTEA NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS article_blobs (
+        content_hash TEXT PRIMARY KEY,
+        dictionary_id INTEGER REFERENCES blob_dictionaries (id),
+        raw_size INTEGER NOT NULL,
+        body BYTEA NOT NULL
+    )
+    """),
+    Migration(4, "Create article revision tables", """
+    CREATE TABLE IF NOT EXISTS article_revisions (
+        id SERIAL PRIMARY KEY,
+        article_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        content_text TEXT,
+        content_hash TEXT NOT NULL,
+        blockchain_tx_hash TEXT,
+        detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (article_id, content_hash)
+    );
+    CREATE TABLE IF NOT EXISTS article_fetch_state (
+        article_id INTEGER PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        content_hash TEXT NOT NULL,
+        unchanged_checks INTEGER NOT NULL DEFAULT 0,
+        checked_at TIMESTAMP,
+        next_check_at TIMESTAMP NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_article_fetch_state_next_check ON article_fetch_state (next_check_at)
+    """),
+    Migration(5, "Create article keyword and entity tables", """
+    CREATE TABLE IF NOT EXISTS article_enrichment (
+        article_id INTEGER PRIMARY KEY,
+        enriched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS article_keywords (
+        article_id INTEGER NOT NULL,
+        keyword TEXT NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (article_id, keyword)
+    );
+    CREATE INDEX IF NOT EXISTS idx_article_keywords_keyword ON article_keywords (keyword);
+    CREATE TABLE IF NOT EXISTS article_entities (
+        article_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        mentions INTEGER NOT NULL,
+        PRIMARY KEY (article_id, kind, name)
+    );
+    CREATE INDEX IF NOT EXISTS idx_article_entities_kind_name ON article_entities (kind, name)
+    """),
+    Migration(6, "Create article media tables", """
+    CREATE TABLE IF NOT EXISTS media (
+        id SERIAL PRIMARY KEY,
+        sha256 TEXT NOT NULL UNIQUE,
+        dhash BIGINT NOT NULL,
+        source_url TEXT NOT NULL,
+        mime_type TEXT NOT NULL,
+        width INTEGER NOT NULL,
+        height INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        thumbnail BYTEA NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS article_media (
+        article_id INTEGER NOT NULL,
+        position SMALLINT NOT NULL,
+        media_id INTEGER NOT NULL REFERENCES media (id),
+        image_url TEXT NOT NULL,
+        PRIMARY KEY (article_id, position)
+    );
+    CREATE INDEX IF NOT EXISTS idx_article_media_image_url ON article_media (image_url);
+    CREATE INDEX IF NOT EXISTS idx_article_media_media_id ON article_media (media_id)
+    """),
+    Migration(7, "Index revision content hashes", """
+    CREATE INDEX IF NOT EXISTS idx_article_revisions_content_hash ON article_revisions (content_hash)
+    """),
+    # Set when the contract already held a hash we had no transaction for,
+    # so the anchoring worker stops checking it
+    Migration(8, "Record hashes found on chain", """
+    ALTER TABLE articles ADD COLUMN IF NOT EXISTS on_chain_at TIMESTAMP;
+    ALTER TABLE article_revisions ADD COLUMN IF NOT EXISTS on_chain_at TIMESTAMP
+    """),
+    Migration(9, "Index article creation times", CREATED_AT_INDEX),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+def current_version(conn) -> int:
+    """
+    Return the schema version of the database.
+
+    Args:
+        conn: psycopg2 connection
+
+    Returns:
+        Highest applied migration version, 0 for an unmigrated database
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            version = 0
+        else:
+            cursor.execute("SELECT COALESCE(max(version), 0) FROM schema_migrations")
+            version = cursor.fetchone()[0]
+    conn.commit()
+    return version
+
+def apply_migrations(conn) -> int:
+    """
+    Bring the schema up to date.
+
+    Args:
+        conn: psycopg2 connection
+
+    Returns:
+        Number of migrations applied
+    """
+    if current_version(conn) >= LATEST_VERSION:
+        return 0
+
+    applied = 0
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """)
+        conn.commit()
+
+        # Another process may have migrated while we waited for the lock
+        version = current_version(conn)
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            with conn.cursor() as cursor:
+                cursor.execute(migration.sql)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (migration.version, migration.description)
+                )
+            conn.commit()
+            applied += 1
+            logger.info(f"Applied migration {migration.version}: {migration.description}")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+    return applied
+
+def main():
+    """Main function to apply migrations or show the schema version."""
+    from db import connect
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    conn = connect()
+    try:
+        if sys.argv[1:] == ["status"]:
+            print(f"Schema version {current_version(conn)} (latest {LATEST_VERSION})")
+        else:
+            applied = apply_migrations(conn)
+            logger.info(f"Applied {applied} migrations, schema is at version {LATEST_VERSION}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
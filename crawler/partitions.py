@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Monthly Partitioning of Articles
+
+Optional range partitioning of the articles table by publication_date, one
+partition per month plus a default partition for anything outside the
+managed window. Recent-window queries only touch the newest partitions and
+old months can be detached instead of deleted row by row.
+
+Converting is a one-off, opt-in operation because PostgreSQL requires unique
+constraints on a partitioned table to include the partition key: the
+primary key becomes (id, publication_date) and source_url is only unique
+per publication_date. URLs stay globally unique through the article_urls
+side table, keyed by source_url and kept current by a trigger on articles
+in the same transaction as every insert, update and delete, so two writers
+racing on one URL fail the second insert whichever store path they use.
+Partitions moved out of the default partition or detached update it too.
+
+    python partitions.py convert               # convert articles in place
+    python partitions.py ensure                # create upcoming partitions
+    python partitions.py detach --before 2024-01
+
+Once the table is partitioned the crawler creates missing monthly partitions
+itself.
+"""
+
+import os
+import re
+import logging
+import argparse
+from datetime import datetime, date
+from typing import Optional, Set
+
+from dotenv import load_dotenv
+
+from migrations import ARTICLE_INDEXES, CREATED_AT_INDEX
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Months before the current one for which the crawler may still create
+# partitions; older articles land in the default partition.
+PARTITION_BACKFILL_MONTHS = int(os.getenv("PARTITION_BACKFILL_MONTHS", "24"))
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+
+PARTITION_NAME_RE = re.compile(r"^articles_y(\d{4})m(\d{2})$")
+
+# Global uniqueness of source_url, which a partitioned table can't enforce
+URL_GUARD = """
+CREATE TABLE IF NOT EXISTS article_urls (
+    source_url TEXT PRIMARY KEY,
+    article_id INTEGER NOT NULL
+);
+CREATE OR REPLACE FUNCTION guard_article_url() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM article_urls WHERE source_url = OLD.source_url;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO article_urls (source_url, article_id) VALUES (NEW.source_url, NEW.id);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS articles_url_guard ON articles;
+CREATE TRIGGER articles_url_guard AFTER INSERT OR DELETE OR UPDATE OF source_url ON articles
+    FOR EACH ROW EXECUTE FUNCTION guard_article_url()
+"""
+
+def _month_start(value: date) -> date:
+    """Return the first day of the month containing value."""
+    return date(value.year, value.month, 1)
+
+def _add_months(value: date, months: int) -> date:
+    """Shift a first-of-month date by a number of months."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    """Return the partition table name for a month."""
+    return f"articles_y{month.year:04d}m{month.month:02d}"
+
+def is_partitioned(conn) -> bool:
+    """
+    Check whether the articles table is partitioned.
+
+    Args:
+        conn: psycopg2 connection
+
+    Returns:
+        True if articles is a partitioned table
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('articles')
+        )
+        """)
+        partitioned = cursor.fetchone()[0]
+    conn.commit()
+    return partitioned
+
+def convert_to_partitioned(conn):
+    """
+    Rebuild the articles table as a partitioned table, keeping all rows.
+
+    Args:
+        conn: psycopg2 connection
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("LOCK TABLE articles IN ACCESS EXCLUSIVE MODE")
+        cursor.execute("SELECT min(publication_date), max(publication_date) FROM articles")
+        first, last = cursor.fetchone()
+
+        cursor.execute("ALTER TABLE articles RENAME TO articles_unpartitioned")
+        cursor.execute("""
+        UPDATE articles_unpartitioned
+        SET publication_date = COALESCE(created_at, CURRENT_TIMESTAMP)
+        WHERE publication_date IS NULL
+        """)
+        cursor.execute("""
+        CREATE TABLE articles (
+            LIKE articles_unpartitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id, publication_date),
+            UNIQUE (source_url, publication_date)
+        ) PARTITION BY RANGE (publication_date)
+        """)
+        cursor.execute("CREATE TABLE articles_default PARTITION OF articles DEFAULT")
+
+        today = _month_start(datetime.now().date())
+        start = max(_month_start(first.date()) if first else today,
+                    _add_months(today, -PARTITION_BACKFILL_MONTHS))
+        end = _add_months(today, PARTITION_MONTHS_AHEAD)
+        month = start
+        while month <= end:
+            cursor.execute(f"""
+            CREATE TABLE {partition_name(month)} PARTITION OF articles
+            FOR VALUES FROM (%s) TO (%s)
+            """, (month, _add_months(month, 1)))
+            month = _add_months(month, 1)
+
+        cursor.execute("INSERT INTO articles SELECT * FROM articles_unpartitioned")
+        cursor.execute("ALTER SEQUENCE articles_id_seq OWNED BY articles.id")
+        cursor.execute("DROP TABLE articles_unpartitioned")
+        cursor.execute(ARTICLE_INDEXES)
+        cursor.execute(CREATED_AT_INDEX)
+        cursor.execute(URL_GUARD)
+        cursor.execute("""
+        INSERT INTO article_urls (source_url, article_id)
+        SELECT source_url, id FROM articles
+        ON CONFLICT DO NOTHING
+        """)
+    conn.commit()
+    logger.info(f"Converted articles to monthly partitions (data from {first} to {last})")
+
+class PartitionManager:
+    """Creates monthly partitions of the articles table on demand."""
+
+    def __init__(self, conn):
+        """
+        Initialize the manager and load the existing partitions.
+
+        Args:
+            conn: psycopg2 connection
+        """
+        self.conn = conn
+        self.months: Set[date] = set()
+        # Months whose table exists but isn't attached, e.g. detached ones;
+        # their articles go to the default partition
+        self.detached: Set[date] = set()
+        self.refresh()
+
+    def refresh(self):
+        """Reload the sets of attached and detached monthly partitions from the catalog."""
+        with self.conn.cursor() as cursor:
+            cursor.execute("""
+            SELECT c.relname, i.inhrelid IS NOT NULL FROM pg_class c
+            LEFT JOIN pg_inherits i ON i.inhrelid = c.oid AND i.inhparent = 'articles'::regclass
+            WHERE c.relkind = 'r' AND c.relname LIKE 'articles_y%'
+            """)
+            rows = cursor.fetchall()
+        self.conn.commit()
+        self.months = set()
+        self.detached = set()
+        for name, attached in rows:
+            match = PARTITION_NAME_RE.match(name)
+            if match:
+                month = date(int(match.group(1)), int(match.group(2)), 1)
+                (self.months if attached else self.detached).add(month)
+
+    def create(self, month: date):
+        """
+        Create the partition for a month, moving any of its rows out of the
+        default partition.
+
+        Args:
+            month: First day of the month
+        """
+        name = partition_name(month)
+        upper = _add_months(month, 1)
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(f"CREATE TABLE {name} (LIKE articles INCLUDING DEFAULTS)")
+                cursor.execute(f"""
+                WITH moved AS (
+                    DELETE FROM articles_default
+                    WHERE publication_date >= %s AND publication_date < %s
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """, (month, upper))
+                # The delete dropped the moved URLs from the guard and the
+                # unattached table has no trigger yet to add them back
+                cursor.execute(f"""
+                INSERT INTO article_urls (source_url, article_id)
+                SELECT source_url, id FROM {name}
+                """)
+                cursor.execute(
+                    f"ALTER TABLE articles ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                    (month, upper)
+                )
+            self.conn.commit()
+            self.months.add(month)
+            logger.info(f"Created partition {name}")
+        except Exception as e:
+            # Most likely another process created it first
+            self.conn.rollback()
+            logger.warning(f"Could not create partition {name}: {e}")
+            self.refresh()
+            if month not in self.months:
+                # Not created by anyone else either; don't retry on every insert
+                self.detached.add(month)
+
+    def ensure_for(self, value: Optional[datetime]):
+        """
+        Make sure the partition for a publication date exists.
+
+        Dates outside the managed window, and months whose partition was
+        detached, are left to the default partition.
+
+        Args:
+            value: Publication date of an article about to be inserted
+        """
+        if value is None:
+            return
+        month = _month_start(value.date())
+        if month in self.months or month in self.detached:
+            return
+        today = _month_start(datetime.now().date())
+        if _add_months(today, -PARTITION_BACKFILL_MONTHS) <= month <= _add_months(today, PARTITION_MONTHS_AHEAD):
+            self.create(month)
+
+    def ensure_upcoming(self):
+        """Create partitions for the current and upcoming months."""
+        today = _month_start(datetime.now().date())
+        for offset in range(PARTITION_MONTHS_AHEAD + 1):
+            month = _add_months(today, offset)
+            if month not in self.months:
+                self.create(month)
+
+    def detach_before(self, cutoff: date) -> int:
+        """
+        Detach monthly partitions that end on or before a cutoff month.
+
+        The detached tables stay in the database as standalone tables, ready
+        to be dumped or dropped; their URLs can be crawled again.
+
+        Args:
+            cutoff: First month to keep attached
+
+        Returns:
+            Number of partitions detached
+        """
+        detached = 0
+        for month in sorted(self.months):
+            if month >= _month_start(cutoff):
+                break
+            with self.conn.cursor() as cursor:
+                # Detaching fires no triggers, so release the URLs here
+                cursor.execute(f"""
+                DELETE FROM article_urls u USING {partition_name(month)} p
+                WHERE u.source_url = p.source_url
+                """)
+                cursor.execute(f"ALTER TABLE articles DETACH PARTITION {partition_name(month)}")
+            self.conn.commit()
+            self.months.discard(month)
+            self.detached.add(month)
+            detached += 1
+            logger.info(f"Detached partition {partition_name(month)}")
+        return detached
+
+def main():
+    """Main function to run partition maintenance commands."""
+    from db import connect
+    from migrations import apply_migrations
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of the articles table")
+    parser.add_argument("command", choices=["convert", "ensure", "detach"])
+    parser.add_argument("--before", help="detach months before YYYY-MM")
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        apply_migrations(conn)
+        if args.command == "convert":
+            if is_partitioned(conn):
+                logger.info("Articles table is already partitioned")
+            else:
+                convert_to_partitioned(conn)
+            return
+
+        if not is_partitioned(conn):
+            parser.error("articles is not partitioned, run 'convert' first")
+        manager = PartitionManager(conn)
+        if args.command == "ensure":
+            manager.ensure_upcoming()
+        else:
+            if not args.before:
+                parser.error("detach requires --before YYYY-MM")
+            cutoff = datetime.strptime(args.before, "%Y-%m").date()
+            logger.info(f"Detached {manager.detach_before(cutoff)} partitions")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Crawl Profiling
+
+Profiles a single crawl cycle and writes everything needed to diagnose a
+slow run into one directory:
+
+    python crawler.py --profile profiles/
+    python crawler.py --profile profiles/ --profile-mode cprofile
+
+The default "sample" mode runs a built-in sampling profiler in two flavours
+at once: wall clock (every thread, including time blocked on the network)
+and CPU (every thread that used CPU time since the previous sample, read
+from per-thread CPU clocks). Stacks are written in the collapsed format read
+by flamegraph.pl, speedscope and inferno. "cprofile" mode records
+deterministic call counts to a .pstats file instead, with one profiler per
+thread started during the run (article workers included) merged at the end.
+Threads already running when profiling starts, other than the main thread,
+aren't seen by cProfile.
+
+Both modes also write per-stage timings taken from the metrics stage timers
+and a tracemalloc report of where memory was allocated during the run.
+tracemalloc slows allocation-heavy code considerably, so compare stage
+timings between profiled runs rather than with unprofiled ones.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 0.005
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 40
+
+def _collapse(frame) -> str:
+    """Render a frame's stack in collapsed (folded) format, root first."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class WallClockSampler:
+    """Samples the stacks of all threads at a fixed wall-clock interval."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wall-sampler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[f"{names.get(thread_id, thread_id)};{_collapse(frame)}"] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+class CpuSampler:
+    """
+    Samples every thread that has used CPU time since the previous sample,
+    weighted by the time used.
+
+    Where per-thread CPU clocks are unavailable, falls back to sampling the
+    main thread on SIGPROF.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._per_thread = hasattr(time, "pthread_getcpuclockid")
+        self._previous = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cpu-sampler", daemon=True)
+
+    def _cpu_time(self, thread_id: int) -> Optional[float]:
+        """CPU seconds a thread has used, None if it has exited."""
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+        except (OSError, OverflowError):
+            return None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        used: Dict[int, float] = {}
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                cpu = self._cpu_time(thread_id)
+                if cpu is None:
+                    continue
+                ticks = round((cpu - used.get(thread_id, cpu)) / self.interval)
+                used[thread_id] = cpu
+                if ticks > 0:
+                    self.samples[f"{names.get(thread_id, thread_id)};{_collapse(frame)}"] += ticks
+
+    def _handle(self, signum, frame):
+        self.samples[_collapse(frame)] += 1
+
+    def start(self):
+        if self._per_thread:
+            self._thread.start()
+        else:
+            self._previous = signal.signal(signal.SIGPROF, self._handle)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        if self._per_thread:
+            self._stop.set()
+            self._thread.join()
+        else:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+
+class ThreadProfilers:
+    """cProfile profilers for the calling thread and every thread started afterwards."""
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _start_in_thread(self, *args):
+        """threading.setprofile hook: runs once at the start of each new thread."""
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.profilers.append(profiler)
+        profiler.enable()
+
+    def enable(self):
+        main = cProfile.Profile()
+        self.profilers.append(main)
+        threading.setprofile(self._start_in_thread)
+        main.enable()
+
+    def disable(self):
+        self.profilers[0].disable()
+        threading.setprofile(None)
+
+    def stats(self, stream=None) -> pstats.Stats:
+        """Merge the profiles of all threads."""
+        with self._lock:
+            profilers = list(self.profilers)
+        return pstats.Stats(*profilers, stream=stream)
+
+def _write_folded(path: str, samples: Counter):
+    """Write collapsed stacks, one "stack count" line each."""
+    with open(path, "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+class StageTimings:
+    """Accumulates durations reported by metrics.time_stage."""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, source: str, seconds: float, failed: bool):
+        with self._lock:
+            entry = self.stats[stage]
+            entry["count"] += 1
+            entry["errors"] += int(failed)
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+def profile_run(func: Callable[[], None], output_dir: str, mode: str = "sample"):
+    """
+    Run a function once under the profilers and write the results.
+
+    Args:
+        func: Function to profile, normally run_crawler
+        output_dir: Directory for the result files
+        mode: "sample" for wall/CPU sampling, "cprofile" for cProfile
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    prefix = os.path.join(output_dir, f"crawl-{stamp}")
+
+    stages = StageTimings()
+    metrics.STAGE_OBSERVERS.append(stages)
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    before = tracemalloc.take_snapshot()
+
+    profiler: Optional[ThreadProfilers] = None
+    wall = cpu = None
+    if mode == "cprofile":
+        profiler = ThreadProfilers()
+        profiler.enable()
+    else:
+        wall, cpu = WallClockSampler(), CpuSampler()
+        wall.start()
+        cpu.start()
+
+    started = time.perf_counter()
+    try:
+        func()
+    finally:
+        elapsed = time.perf_counter() - started
+        if profiler:
+            profiler.disable()
+        else:
+            cpu.stop()
+            wall.stop()
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        metrics.STAGE_OBSERVERS.remove(stages)
+
+    if profiler:
+        profiler.stats().dump_stats(f"{prefix}.pstats")
+        with open(f"{prefix}-top.txt", "w") as f:
+            profiler.stats(stream=f).sort_stats("cumulative").print_stats(60)
+    else:
+        _write_folded(f"{prefix}-wall.folded", wall.samples)
+        _write_folded(f"{prefix}-cpu.folded", cpu.samples)
+
+    after.dump(f"{prefix}.tracemalloc")
+    with open(f"{prefix}-allocations.txt", "w") as f:
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n\n")
+        for stat in after.compare_to(before, "traceback")[:TOP_ALLOCATIONS]:
+            f.write(f"{stat}\n")
+            for line in stat.traceback.format(limit=TRACEMALLOC_FRAMES):
+                f.write(f"    {line}\n")
+            f.write("\n")
+
+    with open(f"{prefix}-stages.json", "w") as f:
+        json.dump({"elapsed_seconds": elapsed, "stages": stages.stats}, f, indent=2)
+
+    logger.info("Profiled crawl in %.1fs, results in %s-*", elapsed, prefix)
+    for stage, entry in sorted(stages.stats.items(), key=lambda item: -item[1]["total_seconds"]):
+        logger.info(
+            "  %-12s %5d calls %8.2fs total %7.3fs max %d errors",
+            stage, entry["count"], entry["total_seconds"], entry["max_seconds"], entry["errors"]
+        )
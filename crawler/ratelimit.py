@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Request Rate Limiting
+
+Spaces out requests to a publisher so that at most a configured number
+start per second, however many worker threads share the limiter.
+"""
+
+import time
+import threading
+
+class RateLimiter:
+    """Thread-safe limiter handing out evenly spaced request slots."""
+
+    def __init__(self, rate: float):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Requests per second, 0 for no limit
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may send its next request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Article Records
+
+The typed record an article travels in from extraction to storage and
+anchoring. The content hash is kept as the raw 32-byte SHA-256 digest and
+only rendered as hex where the database, the contract and the logs expect
+it, so a batch of in-flight articles carries no per-article dict or
+64-character hash string.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional, Tuple
+
+# Column order of ArticleRecord.db_row(), for INSERT and COPY statements
+ARTICLE_COLUMNS = ("title", "source_url", "source_name", "publication_date", "content_text", "content_hash")
+
+def content_digest(text: str) -> bytes:
+    """
+    Compute the raw SHA-256 digest of article content.
+
+    Args:
+        text: Extracted article text
+
+    Returns:
+        32-byte digest
+    """
+    return hashlib.sha256(text.encode()).digest()
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a datetime for a TIMESTAMP (without time zone) column.
+
+    Extracted dates are often timezone-aware; asyncpg refuses those for
+    TIMESTAMP columns, so they are stored as naive UTC. Naive values are
+    returned unchanged.
+
+    Args:
+        value: Datetime, aware or naive, or None
+
+    Returns:
+        Naive datetime, or None
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class ArticleRecord(NamedTuple):
+    """A single article, with fields in ARTICLE_COLUMNS order and the images found on its page."""
+
+    title: str
+    source_url: str
+    source_name: str
+    publication_date: datetime
+    content_text: Optional[str]
+    content_hash: bytes
+    image_urls: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_text(cls, title: str, source_url: str, source_name: str,
+                  publication_date: datetime, content_text: str,
+                  image_urls: Tuple[str, ...] = ()) -> "ArticleRecord":
+        """
+        Build a record, hashing its content.
+
+        Args:
+            title: Article title
+            source_url: Article URL
+            source_name: Name of the news source
+            publication_date: Publication date
+            content_text: Extracted article text
+            image_urls: Absolute URLs of the article's images, lead image first
+
+        Returns:
+            Article record
+        """
+        return cls(title, source_url, source_name, publication_date, content_text,
+                   content_digest(content_text), image_urls)
+
+    @classmethod
+    def from_db(cls, title: str, source_url: str, source_name: str, publication_date: datetime,
+                content_text: Optional[str], content_hash: str) -> "ArticleRecord":
+        """
+        Build a record from an articles row.
+
+        Args:
+            title: Article title
+            source_url: Article URL
+            source_name: Name of the news source
+            publication_date: Publication date
+            content_text: Article text, None if not loaded or stored as a blob
+            content_hash: Hex SHA-256 as stored in the articles table
+
+        Returns:
+            Article record
+
+        Raises:
+            ValueError: If the stored hash is not a hex SHA-256 digest
+        """
+        digest = bytes.fromhex(content_hash)
+        if len(digest) != hashlib.sha256().digest_size:
+            raise ValueError(f"not a SHA-256 digest: {content_hash!r}")
+        return cls(title, source_url, source_name, publication_date, content_text, digest)
+
+    @property
+    def content_hash_hex(self) -> str:
+        """Hex-encoded content hash, as stored in the database and on chain."""
+        return self.content_hash.hex()
+
+    def db_row(self, content_text: Optional[str] = ...) -> Tuple:
+        """
+        Return the values for an articles row in ARTICLE_COLUMNS order.
+
+        Args:
+            content_text: Text to store instead of the record's own, e.g.
+                None when the body is kept in article_blobs
+
+        Returns:
+            Row tuple with the publication date as naive UTC and the
+            content hash hex-encoded
+        """
+        if content_text is ...:
+            content_text = self.content_text
+        return (self.title, self.source_url, self.source_name, naive_utc(self.publication_date),
+                content_text, self.content_hash_hex)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Offline Re-extraction
+
+Recomputes content_text and content_hash for stored articles from the raw
+HTML archive, without crawling again. Run it after changing the extractor or
+the hash normalization:
+
+    python reextract.py --workers 8
+
+Only the latest archived response of each URL is used. Records are parsed
+across a process pool and written back in chunks; after each chunk the
+position is checkpointed so an interrupted run continues where it stopped.
+The checkpoint is removed once a run completes, so the next run starts over.
+
+Articles already anchored keep the hash that is on chain: a changed
+extraction of one is stored as a revision in article_revisions, which
+anchor_pending then anchors, like an edit found by revisiting the page.
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from multiprocessing import Pool
+from typing import Dict, List, Any, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from archive import ArchiveReader, ARCHIVE_DIR
+from blobstore import BlobStore, blob_storage_enabled
+from cache import ARTICLE_CACHE
+from db import connect
+from extraction import decode_html, parse_article
+from logconfig import configure_logging, configure_worker_logging
+from migrations import apply_migrations
+from tracing import attach_carrier, context_carrier, setup_tracing, span
+
+# Setup logging
+configure_logging("reextract.log")
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = "reextract.checkpoint.json"
+
+# The self-join reads the row as it was before the update, for its old hash
+UPDATE_SQL = """
+UPDATE articles AS a
+SET content_text = v.content_text, content_hash = v.content_hash
+FROM (VALUES %s) AS v (source_url, title, content_text, content_hash), articles AS old
+WHERE a.source_url = v.source_url
+  AND old.id = a.id AND old.source_url = a.source_url
+  AND a.blockchain_tx_hash IS NULL AND a.on_chain_at IS NULL
+  AND a.content_hash IS DISTINCT FROM v.content_hash
+RETURNING old.content_hash, a.content_hash
+"""
+
+REVISION_SQL = """
+INSERT INTO article_revisions (article_id, title, content_text, content_hash)
+SELECT a.id, v.title, v.content_text, v.content_hash
+FROM (VALUES %s) AS v (source_url, title, content_text, content_hash)
+JOIN articles a ON a.source_url = v.source_url
+WHERE (a.blockchain_tx_hash IS NOT NULL OR a.on_chain_at IS NOT NULL)
+  AND a.content_hash IS DISTINCT FROM v.content_hash
+ON CONFLICT (article_id, content_hash) DO NOTHING
+RETURNING content_hash
+"""
+
+_reader = None
+
+def _position(entry: Dict[str, Any]) -> Tuple[str, int]:
+    """Sort key identifying a record's place in the archive."""
+    return entry["segment"], entry["offset"]
+
+def _init_worker(archive_dir: str):
+    """Open the archive and tracer once per worker process."""
+    global _reader
+    configure_worker_logging()
+    _reader = ArchiveReader(archive_dir)
+    setup_tracing()
+
+def _reextract(task: Tuple[Dict[str, Any], Dict[str, str]]) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Re-run extraction on one archived response.
+
+    Args:
+        task: Archive index entry and the parent trace context
+
+    Returns:
+        (source_url, title, content_text, content_hash) or None if extraction failed
+    """
+    entry, carrier = task
+    try:
+        with attach_carrier(carrier), span("reextract", url=entry["url"]):
+            record = _reader.read(entry)
+            article = parse_article(record.url, decode_html(record.body, record.headers), "")
+        return article.source_url, article.title, article.content_text, article.content_hash_hex
+    except Exception as e:
+        logger.error(f"Error re-extracting {entry['url']}: {e}")
+        return None
+
+def latest_entries(reader: ArchiveReader) -> List[Dict[str, Any]]:
+    """
+    Collect the latest successful response for every archived URL.
+
+    Args:
+        reader: Archive to scan
+
+    Returns:
+        Index entries ordered by their position in the archive
+    """
+    latest = {}
+    for segment in reader.segments():
+        for entry in reader.iter_index(segment):
+            if entry["status"] != 200:
+                continue
+            current = latest.get(entry["url"])
+            if not current or entry["fetched_at"] >= current["fetched_at"]:
+                latest[entry["url"]] = entry
+    return sorted(latest.values(), key=_position)
+
+def load_checkpoint(path: str) -> Optional[Tuple[str, int]]:
+    """Return the position of the last committed record, if any."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    return data["segment"], data["offset"]
+
+def save_checkpoint(path: str, entry: Dict[str, Any]):
+    """Atomically record the position of the last committed record."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"segment": entry["segment"], "offset": entry["offset"]}, f)
+    os.replace(tmp_path, path)
+
+def clear_checkpoint(path: str):
+    """Remove the checkpoint of a completed run."""
+    if os.path.exists(path):
+        os.remove(path)
+
+def run(archive_dir: str, workers: int, chunk_size: int, checkpoint: str, restart: bool):
+    """
+    Re-extract every archived article and update the articles table.
+
+    Args:
+        archive_dir: Archive directory
+        workers: Number of worker processes
+        chunk_size: Number of articles per database update
+        checkpoint: Checkpoint file path
+        restart: Ignore an existing checkpoint
+    """
+    entries = latest_entries(ArchiveReader(archive_dir))
+    resume_from = None if restart else load_checkpoint(checkpoint)
+    if resume_from:
+        entries = [entry for entry in entries if _position(entry) > resume_from]
+        logger.info(f"Resuming after {resume_from[0]}@{resume_from[1]}")
+
+    total = len(entries)
+    logger.info(f"Re-extracting {total} archived articles with {workers} workers")
+    if not total:
+        clear_checkpoint(checkpoint)
+        return
+
+    conn = connect()
+    apply_migrations(conn)
+    blobs = BlobStore(conn) if blob_storage_enabled() else None
+    processed = updated = revised = failed = 0
+    started = time.monotonic()
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(archive_dir,)) as pool:
+            for start in range(0, total, chunk_size):
+                chunk = entries[start:start + chunk_size]
+                rows = []
+                with span("reextract_chunk", start=start, size=len(chunk)):
+                    carrier = context_carrier()
+                    tasks = [(entry, carrier) for entry in chunk]
+                    for result in pool.imap(_reextract, tasks, chunksize=8):
+                        if result:
+                            rows.append(result)
+                        else:
+                            failed += 1
+
+                with conn.cursor() as cursor:
+                    if blobs:
+                        for _, _, content_text, content_hash in rows:
+                            blobs.put(cursor, content_hash, content_text)
+                        rows = [(url, title, None, content_hash) for url, title, _, content_hash in rows]
+                    results = revisions = []
+                    if rows:
+                        results = execute_values(cursor, UPDATE_SQL, rows, page_size=len(rows), fetch=True)
+                        revisions = execute_values(cursor, REVISION_SQL, rows, page_size=len(rows), fetch=True)
+                conn.commit()
+                save_checkpoint(checkpoint, chunk[-1])
+                for old_hash, new_hash in results:
+                    ARTICLE_CACHE.invalidate_hash(old_hash)
+                    ARTICLE_CACHE.invalidate_hash(new_hash)
+                for (content_hash,) in revisions:
+                    ARTICLE_CACHE.invalidate_hash(content_hash)
+
+                processed += len(chunk)
+                updated += len(results)
+                revised += len(revisions)
+                elapsed = time.monotonic() - started
+                rate = processed / elapsed if elapsed else 0.0
+                eta = (total - processed) / rate if rate else 0.0
+                logger.info(
+                    f"Progress: {processed}/{total} ({rate:.0f}/s, ETA {eta:.0f}s), "
+                    f"{updated} updated, {failed} failed"
+                )
+    finally:
+        conn.close()
+
+    clear_checkpoint(checkpoint)
+    if revised:
+        logger.info(f"{revised} already anchored articles changed and were stored as revisions")
+    logger.info(f"Re-extraction completed: {updated} of {processed} articles updated")
+
+def main():
+    """Main function to run the re-extraction job."""
+    parser = argparse.ArgumentParser(description="Re-extract articles from the raw HTML archive")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="archive directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="articles per database update")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    setup_tracing()
+    run(args.archive_dir, args.workers, args.chunk_size, args.checkpoint, args.restart)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Relevance Filter
+
+Decides, right after extraction, whether an article is worth storing and
+anchoring: it must be in one of RELEVANCE_LANGUAGES and about Palestine.
+Topic pages still list the odd sports result or unrelated regional story,
+and each one that gets through costs a row, a blob and a transaction.
+
+Both checks are cheap enough to run inline in the article workers:
+
+- Topic: each keyword is first looked for with a plain substring search,
+  which runs in C and rules out almost every keyword of an unrelated
+  article; only keywords that occur are matched with a regular expression
+  that checks word boundaries. An article is relevant if its title
+  mentions a keyword or its text does at least RELEVANCE_MIN_MATCHES times.
+  A single alternation of all keywords (or an Aho-Corasick automaton in
+  Python) is an order of magnitude slower with Python's re module.
+- Language: Arabic and Hebrew are told apart from Latin scripts by their
+  letters; Latin-script text is scored by stop-word hits on a sample of
+  its first words. Text too short to tell is never rejected for language.
+"""
+
+import os
+import re
+import logging
+from collections import Counter
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+from records import ArticleRecord
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+RELEVANCE_FILTER = os.getenv("RELEVANCE_FILTER", "1") != "0"
+RELEVANCE_LANGUAGES = frozenset(
+    code.strip() for code in os.getenv("RELEVANCE_LANGUAGES", "en,ar").split(",") if code.strip()
+)
+RELEVANCE_MIN_MATCHES = int(os.getenv("RELEVANCE_MIN_MATCHES", "2"))
+
+# Latin-script keywords match whole words; a trailing * allows any ending
+KEYWORDS = (
+    "palestin*", "gaza*", "west bank", "jerusalem", "al-aqsa", "al aqsa",
+    "ramallah", "hebron", "al-khalil", "jenin", "nablus", "tulkarm", "qalqilya", "jericho",
+    "bethlehem", "rafah", "khan younis", "khan yunis", "deir al-balah", "jabalia", "nuseirat",
+    "sheikh jarrah", "silwan", "masafer yatta", "unrwa", "nakba", "intifada", "hamas", "fatah",
+    "plo", "israeli occupation", "occupied territor*", "settler*",
+    "illegal settlement*", "two-state solution", "right of return", "apartheid",
+)
+# Arabic keywords also match with attached prefixes such as و, ب or ال
+ARABIC_KEYWORDS = (
+    "فلسطين", "غزة", "الضفة الغربية", "القدس", "الأقصى", "رام الله", "الخليل", "جنين", "نابلس",
+    "طولكرم", "بيت لحم", "رفح", "خان يونس", "الأونروا", "النكبة", "الانتفاضة", "الاحتلال", "المستوطن",
+)
+
+class KeywordMatcher:
+    """Counts keyword mentions in a text."""
+
+    def __init__(self, keywords: Iterable[str], arabic_keywords: Iterable[str] = (),
+                 case_sensitive: bool = False):
+        """
+        Compile the keywords.
+
+        Args:
+            keywords: Latin-script keywords, matched as whole words; a
+                trailing "*" allows any ending
+            arabic_keywords: Arabic keywords, matched anywhere in a word
+            case_sensitive: Match case exactly, e.g. to tell "WHO" from "who"
+        """
+        self.case_sensitive = case_sensitive
+        self.patterns = []
+        if not case_sensitive:
+            keywords = (keyword.lower() for keyword in keywords)
+        for keyword in dict.fromkeys(keywords):
+            literal = keyword.rstrip("*")
+            # The literal leads the pattern so re can search for it directly;
+            # the boundary before it is checked on each match instead
+            ending = r"\w*" if keyword.endswith("*") else r"\b"
+            self.patterns.append((keyword, literal, re.compile(re.escape(literal) + ending), True))
+        for keyword in dict.fromkeys(arabic_keywords):
+            self.patterns.append((keyword, keyword, re.compile(re.escape(keyword)), False))
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        Count the mentions of each keyword.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Mentions per keyword, for keywords that occur
+        """
+        if not self.case_sensitive:
+            text = text.lower()
+        counts = {}
+        for keyword, literal, pattern, bounded in self.patterns:
+            if literal not in text:
+                continue
+            mentions = 0
+            for match in pattern.finditer(text):
+                start = match.start()
+                if bounded and start and (text[start - 1].isalnum() or text[start - 1] == "_"):
+                    continue
+                mentions += 1
+            if mentions:
+                counts[keyword] = mentions
+        return counts
+
+    def count(self, text: str) -> int:
+        """
+        Count keyword mentions.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Number of mentions of any keyword
+        """
+        return sum(self.counts(text).values())
+
+KEYWORD_MATCHER = KeywordMatcher(
+    KEYWORDS + tuple(k.strip() for k in os.getenv("RELEVANCE_KEYWORDS", "").split(",") if k.strip()),
+    ARABIC_KEYWORDS
+)
+
+# The most frequent function words of each Latin-script language
+STOP_WORDS = {
+    "en": {"the", "and", "of", "to", "in", "is", "that", "for", "was", "on", "with", "as", "by", "it", "from"},
+    "fr": {"le", "la", "les", "et", "des", "est", "dans", "que", "une", "pour", "du", "au", "sur", "pas", "qui"},
+    "es": {"el", "la", "los", "las", "y", "que", "en", "del", "por", "con", "una", "para", "es", "se", "al"},
+    "de": {"der", "die", "und", "das", "ist", "nicht", "mit", "den", "von", "zu", "ein", "eine", "auf", "im", "sich"},
+    "it": {"il", "di", "che", "la", "e", "per", "un", "una", "del", "della", "sono", "con", "non", "gli", "nel"},
+    "pt": {"o", "de", "que", "e", "do", "da", "em", "um", "para", "com", "uma", "os", "no", "na", "não"},
+    "tr": {"ve", "bir", "bu", "da", "de", "için", "ile", "olarak", "çok", "daha", "olan", "gibi", "ama", "en", "ne"},
+}
+
+ARABIC_RE = re.compile(r"[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]")
+HEBREW_RE = re.compile(r"[\u0590-\u05FF]")
+
+# Enough text to recognize a language, without scanning whole articles
+LANGUAGE_SAMPLE_CHARS = 2000
+LANGUAGE_MIN_WORDS = 20
+
+class Verdict(NamedTuple):
+    """Outcome of the relevance check for one article."""
+
+    relevant: bool
+    language: Optional[str]
+    matches: int
+    reason: str
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Guess the language of a text.
+
+    Args:
+        text: Article text
+
+    Returns:
+        ISO 639-1 code, or None if the text is too short or unrecognized
+    """
+    sample = text[:LANGUAGE_SAMPLE_CHARS]
+    words = sample.lower().split()
+    if len(words) < LANGUAGE_MIN_WORDS:
+        return None
+
+    letters = len(sample) - len(words)
+    if len(ARABIC_RE.findall(sample)) > letters / 2:
+        return "ar"
+    if len(HEBREW_RE.findall(sample)) > letters / 2:
+        return "he"
+
+    counts = Counter(word.strip(".,;:!?\"'()") for word in words)
+    scores = {language: sum(counts[word] for word in stop_words) for language, stop_words in STOP_WORDS.items()}
+    language, score = max(scores.items(), key=lambda item: item[1])
+    # The listed stop words alone are well over a tenth of ordinary prose
+    return language if score >= len(words) / 10 else None
+
+def check_relevance(article: ArticleRecord) -> Verdict:
+    """
+    Decide whether an article should be stored.
+
+    Args:
+        article: Extracted article
+
+    Returns:
+        Verdict with the detected language and the number of keyword matches
+    """
+    text = article.content_text or ""
+    language = detect_language(text)
+    title_matches = KEYWORD_MATCHER.count(article.title or "")
+    matches = title_matches + KEYWORD_MATCHER.count(text)
+
+    if RELEVANCE_LANGUAGES and language is not None and language not in RELEVANCE_LANGUAGES:
+        return Verdict(False, language, matches, f"language {language}")
+    if not title_matches and matches < RELEVANCE_MIN_MATCHES:
+        return Verdict(False, language, matches, f"{matches} keyword matches")
+    return Verdict(True, language, matches, "relevant")
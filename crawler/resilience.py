@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Request Retries and Circuit Breakers
+
+Failed requests are classified before anything else happens:
+
+    transient   connection errors, timeouts, 429 and 5xx responses; retried
+                with exponential backoff and full jitter, honouring
+                Retry-After, and counted against the host's circuit breaker
+    permanent   other 4xx responses and malformed URLs; not retried, and the
+                host is healthy as far as the breaker is concerned
+
+Each host has a circuit breaker. After BREAKER_FAILURES consecutive
+transient failures it opens and every request to the host fails fast with
+CircuitOpenError for BREAKER_COOLDOWN_SECONDS. A single probe request is
+then let through; it closes the breaker if it succeeds and reopens it if not.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+
+from metrics import CIRCUIT_OPENS, HTTP_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_SECONDS = float(os.getenv("RETRY_BASE_SECONDS", "1"))
+RETRY_MAX_SECONDS = float(os.getenv("RETRY_MAX_SECONDS", "30"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "300"))
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# Statuses worth retrying; any other error status won't change on its own
+TRANSIENT_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+T = TypeVar("T")
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose breaker is open."""
+
+def classify_error(error: Exception) -> str:
+    """
+    Classify a request failure.
+
+    Args:
+        error: Exception raised while sending the request or by raise_for_status()
+
+    Returns:
+        TRANSIENT or PERMANENT
+    """
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return TRANSIENT if status is None or status in TRANSIENT_STATUSES or status >= 500 else PERMANENT
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return TRANSIENT
+    return PERMANENT
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After header of a failed response.
+
+    Args:
+        error: Request failure
+
+    Returns:
+        Seconds to wait, or None if the server didn't say
+    """
+    response = getattr(error, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_SECONDS, cap: float = RETRY_MAX_SECONDS) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Number of the failed attempt, starting at 1
+        base: Delay ceiling after the first failure
+        cap: Largest delay ever returned
+
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one host."""
+
+    def __init__(self, host: str, failures: int = BREAKER_FAILURES,
+                 cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            host: Host the breaker guards, for logs and metrics
+            failures: Consecutive transient failures that open the breaker
+            cooldown: Seconds the breaker stays open before a probe
+        """
+        self.host = host
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """True while requests to the host are being refused."""
+        with self._lock:
+            return self.opened_at is not None and (
+                self.probing or time.monotonic() - self.opened_at < self.cooldown
+            )
+
+    def allow(self) -> bool:
+        """
+        Ask to send a request. Once the cooldown is over, only one caller at
+        a time is allowed through as a probe.
+
+        Returns:
+            True if the request may be sent
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        """Record a request that got a response, closing the breaker."""
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit closed for {self.host}")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release(self):
+        """End a probe that failed without reaching the host, e.g. a malformed URL."""
+        with self._lock:
+            self.probing = False
+
+    def record_failure(self):
+        """Record a transient failure, opening the breaker at the threshold."""
+        with self._lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.probing = False
+                CIRCUIT_OPENS.labels(self.host).inc()
+                logger.warning(f"Circuit open for {self.host} after {self.failures} failures, "
+                               f"suspending requests for {self.cooldown:.0f}s")
+
+class Resilience:
+    """Retries and per-host circuit breakers shared by a crawler's requests."""
+
+    def __init__(self, attempts: int = RETRY_ATTEMPTS, sleep: Callable[[float], None] = time.sleep,
+                 prefix: str = ""):
+        """
+        Initialize with every breaker closed.
+
+        Args:
+            attempts: Attempts per request, including the first
+            sleep: Function used to wait between attempts
+            prefix: Prepended to the host in breaker names, logs and metrics,
+                e.g. "media:" for breakers separate from the article ones
+        """
+        self.attempts = max(1, attempts)
+        self.sleep = sleep
+        self.prefix = prefix
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """
+        Return the circuit breaker for a URL's host (and port, if given).
+
+        Args:
+            url: Request URL
+
+        Returns:
+            The host's breaker
+        """
+        parts = urlsplit(url)
+        host = self.prefix + (parts.hostname or "").lower()
+        if parts.port:
+            host = f"{host}:{parts.port}"
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(host)
+            return self.breakers[host]
+
+    def call(self, url: str, request: Callable[[], T]) -> T:
+        """
+        Send a request with retries, through the host's circuit breaker.
+
+        Args:
+            url: Request URL, identifying the host
+            request: Sends the request and raises on failure, including
+                error statuses
+
+        Returns:
+            Whatever request returns
+
+        Raises:
+            CircuitOpenError: If the host's breaker is open
+            Exception: The last failure once retries are exhausted, or the
+                first permanent one
+        """
+        breaker = self.breaker(url)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"circuit open for {breaker.host}")
+            attempt += 1
+            try:
+                result = request()
+            except Exception as e:
+                if classify_error(e) == PERMANENT:
+                    # The host answered; the request itself is at fault
+                    if isinstance(e, requests.HTTPError):
+                        breaker.record_success()
+                    else:
+                        breaker.release()
+                    raise
+                breaker.record_failure()
+                if attempt >= self.attempts or breaker.is_open:
+                    raise
+                delay = retry_after(e)
+                delay = min(delay, RETRY_MAX_SECONDS) if delay is not None else backoff_delay(attempt)
+                HTTP_RETRIES.labels(breaker.host).inc()
+                logger.info(f"Retrying {url} in {delay:.1f}s after attempt {attempt}: {e}")
+                self.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
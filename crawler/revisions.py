@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Article Revisions
+
+Publishers edit articles after the crawler has stored them. Articles
+younger than REVISIT_WINDOW_DAYS are re-fetched on a decaying schedule:
+REVISIT_BASE_HOURS after they were stored, and then twice as long after
+every check that finds no change, up to REVISIT_MAX_HOURS. A change resets
+the interval.
+
+Re-fetches are conditional (If-None-Match / If-Modified-Since with the
+validators of the previous response), so an unchanged page usually costs a
+304 without a body. Otherwise the page is re-extracted and its content
+hash compared with the current one. A real change is stored in
+article_revisions and its new hash anchored; the original articles row and
+its anchor are left as they were.
+
+    python cli.py revisit --limit 200
+"""
+
+import os
+import logging
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Articles re-fetched per crawl cycle, 0 to disable revisits
+REVISIT_BATCH = int(os.getenv("REVISIT_BATCH", "100"))
+REVISIT_WINDOW_DAYS = int(os.getenv("REVISIT_WINDOW_DAYS", "7"))
+REVISIT_BASE_HOURS = float(os.getenv("REVISIT_BASE_HOURS", "6"))
+REVISIT_MAX_HOURS = float(os.getenv("REVISIT_MAX_HOURS", "96"))
+
+class DueArticle(NamedTuple):
+    """A stored article due for a re-fetch, with its last known state."""
+
+    article_id: int
+    source_url: str
+    source_name: str
+    publication_date: Optional[datetime]
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    unchanged_checks: int
+
+def next_check_hours(unchanged_checks: int) -> float:
+    """
+    Hours until the next re-fetch of an article.
+
+    Args:
+        unchanged_checks: Consecutive checks that found no change
+
+    Returns:
+        REVISIT_BASE_HOURS doubled per unchanged check, capped at REVISIT_MAX_HOURS
+    """
+    return min(REVISIT_MAX_HOURS, REVISIT_BASE_HOURS * 2 ** min(unchanged_checks, 32))
+
+def due_articles(conn, limit: int) -> List[DueArticle]:
+    """
+    Find the articles most overdue for a re-fetch.
+
+    Args:
+        conn: psycopg2 connection
+        limit: Maximum number of articles
+
+    Returns:
+        Due articles, most overdue first
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        SELECT a.id, a.source_url, a.source_name, a.publication_date,
+               COALESCE(s.content_hash, a.content_hash), s.etag, s.last_modified,
+               COALESCE(s.unchanged_checks, 0)
+        FROM articles a
+        LEFT JOIN article_fetch_state s ON s.article_id = a.id
+        WHERE a.created_at >= LOCALTIMESTAMP - %s * INTERVAL '1 day'
+          AND COALESCE(s.next_check_at, a.created_at + %s * INTERVAL '1 hour') <= LOCALTIMESTAMP
+        ORDER BY COALESCE(s.next_check_at, a.created_at + %s * INTERVAL '1 hour')
+        LIMIT %s
+        """, (REVISIT_WINDOW_DAYS, REVISIT_BASE_HOURS, REVISIT_BASE_HOURS, limit))
+        rows = cursor.fetchall()
+    conn.commit()
+    return [DueArticle(*row) for row in rows]
+
+def record_check(cursor, article: DueArticle, content_hash: str, unchanged_checks: int,
+                 etag: Optional[str], last_modified: Optional[str]):
+    """
+    Save the outcome of a re-fetch and schedule the next one.
+
+    Args:
+        cursor: psycopg2 cursor
+        article: Article that was re-fetched
+        content_hash: Hex hash of the article's current content
+        unchanged_checks: Consecutive checks without a change, including this one
+        etag: ETag of the response, for the next conditional request
+        last_modified: Last-Modified of the response, for the next conditional request
+    """
+    cursor.execute("""
+    INSERT INTO article_fetch_state (
+        article_id, etag, last_modified, content_hash, unchanged_checks, checked_at, next_check_at
+    ) VALUES (%s, %s, %s, %s, %s, LOCALTIMESTAMP, LOCALTIMESTAMP + %s * INTERVAL '1 hour')
+    ON CONFLICT (article_id) DO UPDATE SET
+        etag = EXCLUDED.etag,
+        last_modified = EXCLUDED.last_modified,
+        content_hash = EXCLUDED.content_hash,
+        unchanged_checks = EXCLUDED.unchanged_checks,
+        checked_at = EXCLUDED.checked_at,
+        next_check_at = EXCLUDED.next_check_at
+    """, (article.article_id, etag, last_modified, content_hash, unchanged_checks,
+          next_check_hours(unchanged_checks)))
+
+def store_revision(cursor, article: DueArticle, title: str, content_text: Optional[str],
+                   content_hash: str) -> Optional[int]:
+    """
+    Store a changed version of an article.
+
+    Args:
+        cursor: psycopg2 cursor
+        article: Article that changed
+        title: Title of the new version
+        content_text: Text of the new version, None if stored as a blob
+        content_hash: Hex hash of the new version
+
+    Returns:
+        Revision ID, or None if the article already had this version
+        (e.g. an edit that was reverted)
+    """
+    cursor.execute("""
+    INSERT INTO article_revisions (article_id, title, content_text, content_hash)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (article_id, content_hash) DO NOTHING
+    RETURNING id
+    """, (article.article_id, title, content_text, content_hash))
+    row = cursor.fetchone()
+    return row[0] if row else None
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - robots.txt Cache
+
+Fetches each host's robots.txt once per ROBOTS_TTL_SECONDS and answers
+"may we fetch this URL?" from memory, so disallowed links are dropped
+before they are queued. Expired entries are refreshed with a conditional
+request (If-None-Match / If-Modified-Since). The publisher's Crawl-delay or
+Request-rate for our user agent caps the crawler's request rate for it.
+
+Fetch results are treated as RFC 9309 describes:
+
+    2xx          rules from the file
+    304          cached rules, valid for another TTL
+    4xx          no rules, everything is allowed
+    5xx, errors  everything is disallowed for ROBOTS_ERROR_TTL_SECONDS, unless
+                 rules from an earlier fetch are still cached
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Sent with every crawler request and matched against robots.txt groups
+USER_AGENT = os.getenv("CRAWLER_USER_AGENT", "PalestineNewsHub/1.0")
+
+ROBOTS_TTL_SECONDS = float(os.getenv("ROBOTS_TTL_SECONDS", "86400"))
+ROBOTS_ERROR_TTL_SECONDS = float(os.getenv("ROBOTS_ERROR_TTL_SECONDS", "600"))
+
+# robots.txt files are small; anything past this is ignored (RFC 9309 asks for at least 500 KiB)
+ROBOTS_MAX_BYTES = 512 * 1024
+
+class RobotsRules:
+    """Parsed robots.txt of one host, with the validators to refresh it."""
+
+    def __init__(self, text: Optional[str] = None, allow_all: bool = True,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Initialize the rules.
+
+        Args:
+            text: robots.txt content, or None for no file
+            allow_all: Without a file, whether everything is allowed or disallowed
+            etag: ETag of the response the rules came from
+            last_modified: Last-Modified of the response the rules came from
+        """
+        self.parser = RobotFileParser()
+        self.from_file = text is not None
+        if text is not None:
+            self.parser.parse(text.splitlines())
+        elif allow_all:
+            self.parser.allow_all = True
+        else:
+            self.parser.disallow_all = True
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = 0.0
+
+    def allowed(self, url: str, user_agent: str = USER_AGENT) -> bool:
+        """
+        Tell whether a URL may be fetched.
+
+        Args:
+            url: URL on this host
+            user_agent: User agent to match groups against
+
+        Returns:
+            True if the URL is not disallowed
+        """
+        return self.parser.can_fetch(user_agent, url)
+
+    def delay(self, user_agent: str = USER_AGENT) -> Optional[float]:
+        """
+        Return the seconds the host asks for between requests.
+
+        Args:
+            user_agent: User agent to match groups against
+
+        Returns:
+            The larger of Crawl-delay and the interval implied by
+            Request-rate, or None if the host sets neither
+        """
+        delays = []
+        crawl_delay = self.parser.crawl_delay(user_agent)
+        if crawl_delay:
+            delays.append(float(crawl_delay))
+        request_rate = self.parser.request_rate(user_agent)
+        if request_rate and request_rate.requests:
+            delays.append(request_rate.seconds / request_rate.requests)
+        return max(delays) if delays else None
+
+class RobotsCache:
+    """Thread-safe robots.txt rules per scheme and host, fetched on first use."""
+
+    def __init__(self, ttl: float = ROBOTS_TTL_SECONDS, error_ttl: float = ROBOTS_ERROR_TTL_SECONDS):
+        """
+        Initialize an empty cache.
+
+        Args:
+            ttl: Seconds rules from a fetched file stay valid
+            error_ttl: Seconds before retrying a host whose robots.txt couldn't be fetched
+        """
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self._rules: Dict[str, RobotsRules] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def rules(self, url: str, session: requests.Session) -> RobotsRules:
+        """
+        Return the rules for a URL's host, fetching or refreshing them if needed.
+
+        Args:
+            url: Any URL on the host
+            session: Session to fetch robots.txt with
+
+        Returns:
+            The host's rules
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            rules = self._rules.get(origin)
+            if rules and rules.expires > time.monotonic():
+                return rules
+            host_lock = self._locks.setdefault(origin, threading.Lock())
+
+        # One fetch per host; other threads wait for its result
+        with host_lock:
+            rules = self._rules.get(origin)
+            if rules and rules.expires > time.monotonic():
+                return rules
+            rules = self._fetch(origin, rules, session)
+            with self._lock:
+                self._rules[origin] = rules
+            return rules
+
+    def _fetch(self, origin: str, cached: Optional[RobotsRules], session: requests.Session) -> RobotsRules:
+        """Fetch an origin's robots.txt, revalidating cached rules."""
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        robots_url = f"{origin}/robots.txt"
+        try:
+            response = session.get(robots_url, headers=headers, timeout=30)
+        except requests.RequestException as e:
+            response = None
+            logger.warning(f"Couldn't fetch {robots_url}: {e}")
+
+        if response is not None and response.status_code == 304 and cached:
+            rules = cached
+            ttl = self.ttl
+        elif response is not None and 200 <= response.status_code < 300:
+            text = response.content[:ROBOTS_MAX_BYTES].decode("utf-8", errors="replace")
+            rules = RobotsRules(text, etag=response.headers.get("ETag"),
+                                last_modified=response.headers.get("Last-Modified"))
+            ttl = self.ttl
+            logger.info(f"Loaded {robots_url}")
+        elif response is not None and 400 <= response.status_code < 500:
+            rules = RobotsRules(allow_all=True)
+            ttl = self.ttl
+        elif cached and cached.from_file:
+            # Keep the last known file through an outage
+            rules = cached
+            ttl = self.error_ttl
+        else:
+            if response is not None:
+                logger.warning(f"{robots_url} returned {response.status_code}, treating the host as disallowed")
+            rules = RobotsRules(allow_all=False)
+            ttl = self.error_ttl
+
+        rules.expires = time.monotonic() + ttl
+        return rules
+
+    def allowed(self, url: str, session: requests.Session) -> bool:
+        """
+        Tell whether a URL may be fetched.
+
+        Args:
+            url: URL to check
+            session: Session to fetch robots.txt with if it isn't cached
+
+        Returns:
+            True if the host's robots.txt allows the URL
+        """
+        return self.rules(url, session).allowed(url)
+
+    def delay(self, url: str, session: requests.Session) -> Optional[float]:
+        """
+        Return the seconds a URL's host asks for between requests.
+
+        Args:
+            url: Any URL on the host
+            session: Session to fetch robots.txt with if it isn't cached
+
+        Returns:
+            Delay from Crawl-delay or Request-rate, None if not set
+        """
+        return self.rules(url, session).delay()
+
+# Cache shared by every crawl cycle in the process
+ROBOTS = RobotsCache()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Source Registry
+
+The news sources the crawler visits, loaded from sources.toml (or
+SOURCES_FILE) instead of being hard-coded in each script. Every source sets
+its index page and link selectors; the [defaults] table and each
+[[source]] entry can also tune:
+
+    concurrency  article downloads in flight at once (default 1)
+    rate         article requests per second, 0 for no limit
+                 (default 1 / CRAWL_DELAY_SECONDS)
+    parser       lxml (default, fastest), or html.parser or html5lib to parse
+                 the index page with BeautifulSoup
+    priority     higher priority sources are crawled first
+    feeds        RSS/Atom feed URLs whose links are crawled as well
+    enabled      false keeps a source listed but out of the crawl
+
+The file is re-read whenever it changes, so edits take effect at the next
+crawl cycle without restarting the crawler.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+SOURCES_FILE = os.getenv("SOURCES_FILE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "sources.toml"
+)
+
+PARSERS = ("html.parser", "lxml", "html5lib")
+
+class Source(NamedTuple):
+    """A news source and its crawl settings."""
+
+    name: str
+    url: str
+    selectors: Tuple[str, ...]
+    base_url: str = ""
+    feeds: Tuple[str, ...] = ()
+    concurrency: int = 1
+    rate: Optional[float] = None
+    parser: str = "lxml"
+    priority: int = 0
+    enabled: bool = True
+
+SETTINGS = ("base_url", "feeds", "concurrency", "rate", "parser", "priority", "enabled")
+
+def _source(entry: Dict[str, Any], defaults: Dict[str, Any]) -> Source:
+    """Build and validate one source from its table and the defaults."""
+    name = entry.get("name")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"source without a name: {entry}")
+    unknown = set(entry) - set(Source._fields)
+    if unknown:
+        raise ValueError(f"{name}: unknown settings {sorted(unknown)}")
+
+    values = {**defaults, **entry}
+    for key in ("url", "selectors"):
+        if key not in values:
+            raise ValueError(f"{name}: missing {key}")
+    if isinstance(values["selectors"], str):
+        values["selectors"] = [values["selectors"]]
+    values["selectors"] = tuple(values["selectors"])
+    values["feeds"] = tuple(values.get("feeds", ()))
+    if not values["selectors"]:
+        raise ValueError(f"{name}: at least one selector is required")
+    if values.get("parser", "lxml") not in PARSERS:
+        raise ValueError(f"{name}: parser must be one of {', '.join(PARSERS)}")
+    if int(values.get("concurrency", 1)) < 1:
+        raise ValueError(f"{name}: concurrency must be at least 1")
+    if values.get("rate") is not None and float(values["rate"]) < 0:
+        raise ValueError(f"{name}: rate can't be negative")
+    return Source(**values)
+
+def parse_sources(data: Dict[str, Any]) -> List[Source]:
+    """
+    Build sources from a parsed registry file.
+
+    Args:
+        data: Parsed TOML with an optional [defaults] table and [[source]] entries
+
+    Returns:
+        Sources sorted by descending priority, in file order otherwise
+
+    Raises:
+        ValueError: If an entry is invalid
+    """
+    defaults = data.get("defaults", {})
+    unknown = set(defaults) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"defaults: unknown settings {sorted(unknown)}")
+
+    sources = [_source(entry, defaults) for entry in data.get("source", [])]
+    names = [source.name for source in sources]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"duplicate sources: {sorted(duplicates)}")
+    return sorted(sources, key=lambda source: -source.priority)
+
+def load_sources(path: str = SOURCES_FILE) -> List[Source]:
+    """
+    Load every source from a registry file, including disabled ones.
+
+    Args:
+        path: Path of the TOML file
+
+    Returns:
+        Sources sorted by descending priority
+    """
+    with open(path, "rb") as f:
+        return parse_sources(tomllib.load(f))
+
+class SourceRegistry:
+    """Sources from a registry file, reloaded when the file changes."""
+
+    def __init__(self, path: str = SOURCES_FILE):
+        """
+        Initialize the registry. The file is read on first use.
+
+        Args:
+            path: Path of the TOML file
+        """
+        self.path = path
+        self._sources: Optional[List[Source]] = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def sources(self) -> List[Source]:
+        """
+        Return the enabled sources, reloading the file if it changed.
+
+        A file that fails to load is reported and the previous sources are
+        kept, so a bad edit doesn't stop a running crawler.
+
+        Returns:
+            Enabled sources sorted by descending priority
+        """
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != self._mtime:
+                    self._sources = load_sources(self.path)
+                    self._mtime = mtime
+                    logger.info(f"Loaded {len(self._sources)} sources from {self.path}")
+            except (OSError, ValueError, TypeError, tomllib.TOMLDecodeError) as e:
+                if self._sources is None:
+                    raise
+                logger.error(f"Keeping previous sources, failed to load {self.path}: {e}")
+            return [source for source in self._sources if source.enabled]
+
+# Registry shared by everything in the process
+REGISTRY = SourceRegistry()
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from asyncstore import AsyncArticleStore
+from cache import ArticleCache, LRUCache
+from records import ArticleRecord
+
+AWARE = datetime(2026, 3, 1, 2, 30, tzinfo=timezone(timedelta(hours=3)))
+NAIVE_UTC = datetime(2026, 2, 28, 23, 30)
+
+class FakeConnection:
+    """Records what the store sends, rejecting aware datetimes like asyncpg does."""
+
+    def __init__(self):
+        self.sent = []
+
+    def _check(self, values):
+        for value in values:
+            if isinstance(value, datetime) and value.tzinfo is not None:
+                raise TypeError("can't subtract offset-naive and offset-aware datetimes")
+        if values:
+            self.sent.append(values)
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, *args):
+        self._check(args)
+
+    async def fetchval(self, query, *args):
+        self._check(args)
+        return None if query.lstrip().startswith("SELECT") else 1
+
+    async def copy_records_to_table(self, table, records, columns):
+        for record in records:
+            self._check(record)
+
+    async def fetch(self, query, *args):
+        return []
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    def acquire(self):
+        return self.conn
+
+def make_store():
+    return AsyncArticleStore(FakePool(), cache=ArticleCache(LRUCache()))
+
+def aware_article(url="https://example.com/a"):
+    return ArticleRecord.from_text("Title", url, "Example", AWARE, "Body")
+
+def test_store_article_with_aware_date():
+    store = make_store()
+    assert asyncio.run(store.store_article(aware_article())) == 1
+    assert NAIVE_UTC in store.pool.conn.sent[-1]
+
+def test_store_articles_with_aware_date():
+    store = make_store()
+    asyncio.run(store.store_articles([aware_article(), aware_article("https://example.com/b")]))
+    assert all(NAIVE_UTC in row for row in store.pool.conn.sent)
+    assert len(store.pool.conn.sent) == 2
@@ -0,0 +1,11 @@
+from enrichment import extract_people, extract_tags
+
+TEXT = ("Prime Minister Benjamin Netanyahu met Joe Biden in Jerusalem. Later, Prime Minister "
+        "Benjamin Netanyahu said talks would continue.")
+
+def test_multi_word_title_is_trimmed():
+    assert extract_people(TEXT)["Benjamin Netanyahu"] == 2
+
+def test_name_after_prime_minister_is_tagged():
+    _, entities = extract_tags("Talks in Jerusalem", TEXT)
+    assert ("person", "Benjamin Netanyahu", 2) in entities
@@ -0,0 +1,14 @@
+from links import extract_links
+from urlnorm import canonicalize_url
+
+def test_malformed_href_is_dropped():
+    assert canonicalize_url("http://[oops/path", "https://example.com/") is None
+
+def test_malformed_href_does_not_drop_the_page():
+    html = """
+    <a href="/news/one">One</a>
+    <a href="http://[oops/path">Broken</a>
+    <a href="two">Two</a>
+    """
+    links = extract_links(html, ("a",), "https://example.com", page_url="https://example.com/news/")
+    assert links == ["https://example.com/news/one", "https://example.com/news/two"]
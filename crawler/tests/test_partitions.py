@@ -0,0 +1,32 @@
+from datetime import datetime
+from unittest import mock
+
+from partitions import PartitionManager, _add_months, _month_start, partition_name
+
+def make_manager(rows):
+    conn = mock.MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = rows
+    return PartitionManager(conn), cursor
+
+def test_detached_month_is_not_recreated():
+    month = _add_months(_month_start(datetime.now().date()), -3)
+    manager, cursor = make_manager([(partition_name(month), False)])
+    assert month in manager.detached and month not in manager.months
+    cursor.execute.reset_mock()
+    manager.ensure_for(datetime(month.year, month.month, 15))
+    cursor.execute.assert_not_called()
+
+def test_failed_create_is_not_retried():
+    month = _add_months(_month_start(datetime.now().date()), -3)
+    manager, cursor = make_manager([])
+
+    def execute(query, *args):
+        if "CREATE TABLE" in query:
+            raise Exception("relation already exists")
+
+    cursor.execute.side_effect = execute
+    manager.ensure_for(datetime(month.year, month.month, 15))
+    creates = sum("CREATE TABLE" in call.args[0] for call in cursor.execute.call_args_list)
+    manager.ensure_for(datetime(month.year, month.month, 20))
+    assert sum("CREATE TABLE" in call.args[0] for call in cursor.execute.call_args_list) == creates == 1
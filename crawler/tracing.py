@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Crawler Tracing
+
+Optional OpenTelemetry spans for each article as it moves through fetch,
+extract, store and anchor. Tracing is off unless TRACING_EXPORTER is set:
+
+    TRACING_EXPORTER=file   # append JSON spans to TRACING_FILE
+    TRACING_EXPORTER=otlp   # send to the collector at OTEL_EXPORTER_OTLP_ENDPOINT
+
+When tracing is off, or the OpenTelemetry packages are not installed, span()
+is a no-op and nothing is imported.
+
+Spans started in thread pool workers need the submitting thread's context
+(wrap the callable with in_current_context); process pool workers get it as
+a carrier dict from context_carrier() and resume it with attach_carrier().
+"""
+
+import os
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "")
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+SERVICE_NAME = "palestine-news-crawler"
+
+_tracer = None
+_setup_lock = threading.Lock()
+
+def setup_tracing() -> bool:
+    """
+    Configure the tracer provider and exporter once per process.
+
+    Returns:
+        True if spans are being recorded
+    """
+    global _tracer
+    if _tracer is not None or not TRACING_EXPORTER:
+        return _tracer is not None
+
+    with _setup_lock:
+        if _tracer is not None:
+            return True
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:
+            logger.error("Tracing disabled: opentelemetry-sdk is not installed")
+            return False
+
+        if TRACING_EXPORTER == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError:
+                logger.error("Tracing disabled: opentelemetry-exporter-otlp is not installed")
+                return False
+            exporter = OTLPSpanExporter()
+        elif TRACING_EXPORTER == "file":
+            exporter = _file_exporter(TRACING_FILE)
+        else:
+            logger.error(f"Tracing disabled: unknown exporter {TRACING_EXPORTER!r}")
+            return False
+
+        provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        atexit.register(provider.shutdown)
+        _tracer = trace.get_tracer(__name__)
+        logger.info(f"Tracing enabled with the {TRACING_EXPORTER} exporter")
+        return True
+
+def _file_exporter(path: str):
+    """Build an exporter that appends one JSON span per line to a file."""
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonLinesSpanExporter(SpanExporter):
+        """Writes finished spans as JSON lines."""
+
+        def __init__(self):
+            self._file = open(path, "a", encoding="utf-8")
+            self._lock = threading.Lock()
+
+        def export(self, spans):
+            with self._lock:
+                for finished in spans:
+                    self._file.write(finished.to_json(indent=None) + "\n")
+                self._file.flush()
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            with self._lock:
+                self._file.close()
+
+    return JsonLinesSpanExporter()
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Any]]:
+    """
+    Record a span around a block, nested under the current span.
+
+    Args:
+        name: Span name
+        **attributes: Span attributes
+
+    Yields:
+        The active span, or None when tracing is off
+    """
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+def context_carrier() -> Dict[str, str]:
+    """
+    Serialize the current trace context for another process.
+
+    Returns:
+        W3C trace context headers, empty when tracing is off
+    """
+    carrier: Dict[str, str] = {}
+    if _tracer is not None:
+        from opentelemetry import propagate
+        propagate.inject(carrier)
+    return carrier
+
+@contextmanager
+def attach_carrier(carrier: Dict[str, str]) -> Iterator[None]:
+    """
+    Make a context from context_carrier() current for a block.
+
+    Args:
+        carrier: Serialized trace context
+    """
+    if _tracer is None or not carrier:
+        yield
+        return
+    from opentelemetry import context, propagate
+    token = context.attach(propagate.extract(carrier))
+    try:
+        yield
+    finally:
+        context.detach(token)
+
+def in_current_context(func: Callable) -> Callable:
+    """
+    Bind a callable to the caller's trace context, for use in thread pools.
+
+    Args:
+        func: Callable to run in a worker thread
+
+    Returns:
+        Wrapped callable
+    """
+    if _tracer is None:
+        return func
+    from opentelemetry import context
+    parent = context.get_current()
+
+    def run(*args, **kwargs):
+        token = context.attach(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            context.detach(token)
+    return run
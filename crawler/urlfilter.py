@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Stored URL Filter
+
+An in-process index of the URLs in articles.source_url, kept as a sorted
+array of 64-bit hashes (8 bytes per article) so that most "is this article
+already stored?" checks are answered without a database round trip.
+
+The filter never misses a URL it has loaded, but two URLs can share a hash
+and rows inserted elsewhere show up only at the next refresh, so:
+
+- not in the filter: treated as new; store_article still checks the
+  database before inserting
+- in the filter: possibly stored, confirmed with a database query
+
+The process-wide KNOWN_URLS is loaded in full once and then topped up with
+rows added since the last refresh at the start of each crawl cycle.
+"""
+
+import hashlib
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip by the server-side cursor
+FETCH_SIZE = 10000
+
+def url_key(url: str) -> int:
+    """
+    Hash a URL to the 64-bit key stored in the filter.
+
+    Args:
+        url: Canonical article URL
+
+    Returns:
+        Unsigned 64-bit hash
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "big")
+
+class UrlFilter:
+    """Sorted array of URL hashes with a set for URLs added since the last merge."""
+
+    def __init__(self):
+        """Initialize an empty filter."""
+        self._keys = array("Q")
+        self._added = set()
+        self._max_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys) + len(self._added)
+
+    def _merge(self, keys: Iterable[int]):
+        """Fold new keys and the recently added ones into the sorted array."""
+        merged = sorted(set(keys) | self._added)
+        if merged:
+            # Mostly sorted input, which timsort handles in close to linear time
+            self._keys = array("Q", sorted(self._keys + array("Q", merged)))
+        self._added.clear()
+
+    def refresh(self, conn) -> int:
+        """
+        Load the URLs of articles stored since the last refresh.
+
+        Args:
+            conn: psycopg2 connection
+
+        Returns:
+            Number of URLs loaded
+        """
+        with self._lock:
+            keys = []
+            max_id = self._max_id
+            with conn.cursor(name="url_filter_refresh") as cursor:
+                cursor.itersize = FETCH_SIZE
+                cursor.execute("SELECT id, source_url FROM articles WHERE id > %s", (self._max_id,))
+                for article_id, url in cursor:
+                    keys.append(url_key(url))
+                    max_id = max(max_id, article_id)
+            conn.rollback()
+            self._merge(keys)
+            self._max_id = max_id
+            return len(keys)
+
+    def add(self, url: str):
+        """
+        Record a URL as stored.
+
+        Args:
+            url: Canonical article URL
+        """
+        with self._lock:
+            self._added.add(url_key(url))
+
+    def might_contain(self, url: str) -> bool:
+        """
+        Tell whether a URL may be stored.
+
+        Args:
+            url: Canonical article URL
+
+        Returns:
+            False if the URL is not in the filter, True if it may be stored
+        """
+        key = url_key(url)
+        with self._lock:
+            if key in self._added:
+                return True
+            index = bisect_left(self._keys, key)
+            return index < len(self._keys) and self._keys[index] == key
+
+# Filter shared by every crawl cycle in the process
+KNOWN_URLS = UrlFilter()
+
+# URLs that were downloaded but rejected by the relevance filter; kept only
+# in memory, so later cycles of this process don't download them again
+REJECTED_URLS = UrlFilter()
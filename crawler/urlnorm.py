@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - URL Canonicalization
+
+Reduces the many spellings of an article URL found in index pages and feeds
+(relative and protocol-relative links, ../ segments, fragments, tracking
+parameters, shuffled query strings, default ports, mixed-case hosts) to a
+single form, so an article is fetched and stored under one source_url.
+"""
+
+import re
+import posixpath
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only identify a campaign or click, never the article
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ocid", "cmpid", "ref_src", "at_medium", "at_campaign", "at_custom1",
+    "at_custom2", "at_custom3", "at_custom4",
+})
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+PERCENT_ESCAPE_RE = re.compile(r"%[0-9A-Fa-f]{2}")
+
+# Characters that never need escaping (RFC 3986 section 2.3)
+UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+def _normalize_escape(match: re.Match) -> str:
+    """Decode an escaped unreserved character, upper-case any other escape."""
+    char = chr(int(match.group(0)[1:], 16))
+    return char if char in UNRESERVED else match.group(0).upper()
+
+def _normalize_path(path: str) -> str:
+    """Remove dot segments and duplicate slashes, keeping a trailing slash."""
+    if not path:
+        return "/"
+    normalized = posixpath.normpath(path)
+    # normpath keeps a leading "//" and drops the trailing slash
+    normalized = "/" + normalized.lstrip("/")
+    if path.endswith("/") and normalized != "/":
+        normalized += "/"
+    return normalized
+
+def is_tracking_param(name: str) -> bool:
+    """
+    Tell whether a query parameter only tracks campaigns or clicks.
+
+    Args:
+        name: Query parameter name
+
+    Returns:
+        True if the parameter can be dropped
+    """
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve a link and reduce it to its canonical form.
+
+    Args:
+        url: URL or link as found in a page or feed
+        base: URL the link is relative to
+
+    Returns:
+        Canonical absolute URL, or None if the link is not http(s)
+    """
+    url = url.strip()
+    try:
+        # urljoin parses the link too, so a malformed one fails here
+        if base:
+            url = urljoin(base, url)
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    netloc = parts.hostname.rstrip(".")
+    if ":" in netloc:
+        netloc = f"[{netloc}]"
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{userinfo}@{netloc}"
+
+    path = _normalize_path(PERCENT_ESCAPE_RE.sub(_normalize_escape, parts.path))
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(name)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+def same_site(url: str, other: str) -> bool:
+    """
+    Tell whether two canonical URLs are on the same site, ignoring "www.".
+
+    Args:
+        url: Canonical URL
+        other: Canonical URL
+
+    Returns:
+        True if both URLs have the same host
+    """
+    def host(value: str) -> str:
+        hostname = urlsplit(value).hostname or ""
+        return hostname[4:] if hostname.startswith("www.") else hostname
+
+    return host(url) == host(other)
+
+def canonical_source_url(url: str, declared: Optional[str]) -> str:
+    """
+    Pick the URL an article is stored under, honouring the page's own
+    <link rel="canonical"> when it points to the same site.
+
+    Args:
+        url: Canonical URL the article was fetched from
+        declared: Canonical link declared by the page, possibly relative
+
+    Returns:
+        Canonical source URL
+    """
+    if declared:
+        canonical = canonicalize_url(declared, url)
+        # A page can't claim an article on another site
+        if canonical and same_site(canonical, url):
+            return canonical
+    return url
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Palestine News Hub - Article Verification
+
+Recomputes the content hash of stored articles and compares it with the
+stored content_hash, reading bodies from article_blobs where content_text is
+NULL. Given the verifier contract, anchored hashes are also checked on chain.
+
+    python cli.py verify
+    python cli.py verify --source "Al Jazeera" --chain
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, Optional
+
+from blobstore import BlobStore, blob_storage_enabled
+from extraction import compute_content_hash
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip by the server-side cursor
+FETCH_SIZE = 500
+
+def verify_articles(conn, contract=None, source: Optional[str] = None,
+                    limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Check stored articles against their content hashes.
+
+    Args:
+        conn: psycopg2 connection
+        contract: Verifier contract to check anchored hashes against, or None
+        source: Only check articles from this source
+        limit: Maximum number of articles to check, newest first
+
+    Returns:
+        Number of articles per outcome: ok, mismatch, missing_body and,
+        when checking the chain, not_on_chain
+    """
+    blobs = None
+    if blob_storage_enabled():
+        try:
+            # BlobStore commits while loading its dictionary, which would close
+            # the server-side cursor, so it is set up first
+            blobs = BlobStore(conn)
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"Blob storage unavailable, articles without content_text can't be checked: {e}")
+
+    query = """
+    SELECT id, source_url, content_text, content_hash, blockchain_tx_hash
+    FROM articles
+    """
+    params = []
+    if source:
+        query += " WHERE source_name = %s"
+        params.append(source)
+    query += " ORDER BY publication_date DESC NULLS LAST"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    outcomes: Counter = Counter()
+    with conn.cursor(name="verify_articles") as cursor:
+        cursor.itersize = FETCH_SIZE
+        cursor.execute(query, params)
+        for article_id, url, text, content_hash, tx_hash in cursor:
+            if text is None and blobs:
+                text = blobs.get(content_hash)
+            if text is None:
+                outcomes["missing_body"] += 1
+                logger.warning(f"No body stored for article {article_id}: {url}")
+                continue
+            if compute_content_hash(text) != content_hash:
+                outcomes["mismatch"] += 1
+                logger.warning(f"Content hash mismatch for article {article_id}: {url}")
+                continue
+            if contract is not None and tx_hash and not contract.functions.isArticleHashStored(content_hash).call():
+                outcomes["not_on_chain"] += 1
+                logger.warning(f"Anchored hash not found on chain for article {article_id}: {url}")
+                continue
+            outcomes["ok"] += 1
+    conn.rollback()
+
+    logger.info("Verified articles: " + ", ".join(f"{key}={value}" for key, value in sorted(outcomes.items())))
+    return dict(outcomes)
@@ -6,7 +6,7 @@ CREATE DATABASE palestine_news;
 -- Connect to the database
 \c palestine_news;
 
--- Create articles table
+-- Create articles table (the crawler applies the full versioned schema from crawler/migrations.py on startup)
 CREATE TABLE IF NOT EXISTS articles (
     id SERIAL PRIMARY KEY,
     title TEXT NOT NULL,
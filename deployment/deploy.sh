@@ -56,7 +56,7 @@ cp -r backend/{package.json,package-lock.json,server.js,routes,models,utils} $DE
 
 # Copy crawler files
 mkdir -p $DEPLOY_DIR/crawler
-cp -r crawler/{requirements.txt,crawler.py,article_scraper.py,contract_abi.json,temp_env.txt} $DEPLOY_DIR/crawler
+cp -r crawler/*.py crawler/{sources.toml,requirements.txt,contract_abi.json,temp_env.txt} $DEPLOY_DIR/crawler
 
 # Copy Nginx config
 mkdir -p $DEPLOY_DIR/nginx
@@ -61,7 +61,7 @@ cp -r backend/{package.json,package-lock.json,server.js,routes,models,utils} $DE
 
 # Copy crawler files
 mkdir -p $DEPLOY_DIR/crawler
-cp -r crawler/{requirements.txt,crawler.py,article_scraper.py,contract_abi.json,temp_env.txt} $DEPLOY_DIR/crawler
+cp -r crawler/*.py crawler/{sources.toml,requirements.txt,contract_abi.json,temp_env.txt} $DEPLOY_DIR/crawler
 
 # Create test Nginx config
 mkdir -p $DEPLOY_DIR/nginx
@@ -158,7 +158,7 @@ After=network.target
 Type=simple
 User=www-data
 WorkingDirectory=$TEST_DIR/crawler
-ExecStart=/bin/bash -c 'source venv/bin/activate && python crawler.py'
+ExecStart=/bin/bash -c 'source venv/bin/activate && python cli.py daemon'
 Restart=on-failure
 
 [Install]